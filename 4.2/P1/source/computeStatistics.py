@@ -1,13 +1,198 @@
+import os
 import sys
+import glob
 import time
+import json
 import logging
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from statistics_core import mean, median, mode, variance_population, std_population
-from file_utils import read_numbers
+# Instrumentation shared with P2 and P3 lives in 4.2/shared
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
+# pylint: disable=wrong-import-position
+from cli_options import Switches, ValuedFlags, parse_flag_args, positive_int
+from instrumentation import PhaseTimer, Profiler, locked_append, split_profile_args
+
+from statistics_core import (
+    DEFAULT_MODE_CAPACITY,
+    MODE_METHODS,
+    StreamingStats,
+    median,
+    median_and_mode,
+    percentile,
+)
+from file_utils import (
+    DEFAULT_RANGE_BYTES,
+    complete_lines_end,
+    iter_range_blocks,
+    split_ranges,
+)
+from incremental_state import IncrementalState, IncrementalStore
+from quantile_sketch import KLLSketch
+from result_cache import CACHE_VERSION, ResultCache
 
 logging.basicConfig(level=logging.INFO)
 
+# Above this many values (~400 MB as array('d')) the exact median is dropped
+# and the stream switches to a constant-memory estimate.
+MAX_EXACT_VALUES = 50_000_000
+# Suffix of the result keys that hold that estimate
+APPROX_LABEL = " (approx)"
+# Mode of the heavy method when the summary cancelled out every counter
+# (e.g. all values distinct): no value is known to be frequent
+NO_FREQUENT_VALUE = "none: no value occurs more than n/(capacity+1) times"
+
+DEFAULT_PERCENTILES = [50.0, 90.0, 99.0]
+
+RESULTS_FILE = Path("../results") / "StatisticsResults.txt"
+
+USAGE = (
+    "Usage: python computeStatistics.py [--approx] [--percentiles 50,90,99] "
+    "[--sketch-out sketch.json] [--workers N]\n"
+    "       [--mode-method table|sort|heavy] [--mode-capacity K] "
+    "fileWithData.txt\n"
+    "       python computeStatistics.py --batch [--workers N] "
+    "[options] file1.txt file2.txt 'data/*.txt' ...\n"
+    "       (--cache reuses results of unchanged files by content hash;\n"
+    "        --incremental only parses what was appended since the last run;\n"
+    "        --profile[=cprofile|tracemalloc|all] appends a profile summary)"
+)
+
+
+@dataclass
+class RunOptions:  # pylint: disable=too-many-instance-attributes
+    """Command line switches of computeStatistics."""
+    approx: bool = False
+    percentiles: List[float] = field(default_factory=list)
+    sketch_out: Optional[str] = None
+    batch: bool = False
+    workers: Optional[int] = None
+    range_bytes: int = DEFAULT_RANGE_BYTES
+    # None: "heavy" (bounded) with --approx, "table" (exact) otherwise
+    mode_method: Optional[str] = None
+    mode_capacity: int = DEFAULT_MODE_CAPACITY
+    # Opt-in: a cache hit skips parsing, so invalid lines are not logged
+    use_cache: bool = False
+    incremental: bool = False
+
+    @property
+    def resolved_mode_method(self) -> str:
+        if self.mode_method is not None:
+            return self.mode_method
+        return "heavy" if self.approx else "table"
+
+    def cache_settings(self) -> str:
+        """The options that change the results, as part of a cache key."""
+        return repr(
+            (
+                CACHE_VERSION,
+                self.approx,
+                self.percentiles,
+                self.range_bytes,
+                self.resolved_mode_method,
+                self.mode_capacity,
+            )
+        )
+
+
+@dataclass
+class RangeState:
+    """Mergeable partial result of one byte range of an input file."""
+    stats: StreamingStats
+    values: Optional[array] = None
+    sketch: Optional[KLLSketch] = None
+
+
+@dataclass
+class CaseOutput:
+    """Everything one input file produces."""
+    case_name: str
+    results: Optional[Dict[str, object]]
+    elapsed: float
+    sketch: Optional[KLLSketch] = None
+    phases: PhaseTimer = field(default_factory=PhaseTimer)
+
+    def to_text(self) -> str:
+        output_lines: list[str] = []
+        output_lines.append(f"TestCase: {self.case_name}")
+        for key, value in self.results.items():
+            output_lines.append(f"{key}: {value}")
+        output_lines.append(f"ExecutionTimeSeconds: {self.elapsed}")
+        output_lines.append("-" * 60)
+        return "\n".join(output_lines)
+
+
+def _parse_percentiles(text: str) -> List[float]:
+    values: List[float] = []
+    for item in text.split(","):
+        value = float(item.strip().lstrip("pP"))
+        if not 0.0 < value <= 100.0:
+            raise ValueError(f"Percentile out of range: {item}")
+        values.append(value)
+    return values
+
+
+def _mode_method(text: str) -> str:
+    if text not in MODE_METHODS:
+        raise ValueError(f"--mode-method must be one of {MODE_METHODS}")
+    return text
+
+
+# Flags without a value -> (RunOptions attribute, value to set)
+_SWITCHES: Switches = {
+    "--approx": ("approx", True),
+    "--batch": ("batch", True),
+    "--cache": ("use_cache", True),
+    "--incremental": ("incremental", True),
+}
+
+# Flags with a value -> (RunOptions attribute, converter)
+_VALUED_FLAGS: ValuedFlags = {
+    "--percentiles": ("percentiles", _parse_percentiles),
+    "--sketch-out": ("sketch_out", str),
+    "--workers": ("workers", positive_int),
+    "--mode-method": ("mode_method", _mode_method),
+    "--mode-capacity": ("mode_capacity", positive_int),
+}
+
+
+def _parse_args(argv: List[str]) -> tuple[RunOptions, List[str]]:
+    """Split argv into options and input files; raises ValueError if invalid."""
+    options = RunOptions()
+    files = parse_flag_args(argv, options, _VALUED_FLAGS, _SWITCHES)
+
+    if options.approx and options.mode_method == "sort":
+        raise ValueError("--mode-method sort needs the values; drop --approx")
+    if options.approx and options.mode_method == "table":
+        raise ValueError(
+            "--mode-method table grows with the distinct values; "
+            "--approx uses the bounded heavy mode"
+        )
+    if options.approx and not options.percentiles:
+        options.percentiles = list(DEFAULT_PERCENTILES)
+    return options, files
+
+
+def _expand_inputs(patterns: List[str]) -> List[str]:
+    """Expand glob patterns (sorted) while keeping the given order."""
+    files: List[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else []
+        if matches:
+            files.extend(matches)
+        else:
+            files.append(pattern)
+    return files
+
+
+def _percentile_key(value: float) -> str:
+    return f"P{value:g}"
+
 
 def _extract_case_name(input_path: str) -> str:
     """Extract a friendly case name from the input path (e.g., TC1.txt -> TC1)."""
@@ -15,48 +200,342 @@ def _extract_case_name(input_path: str) -> str:
     return name.replace(".txt", "")
 
 
-def main() -> None:
-    if len(sys.argv) != 2:
-        print("Usage: python computeStatistics.py fileWithData.txt")
-        sys.exit(1)
+def _new_stats(options: RunOptions) -> StreamingStats:
+    return StreamingStats(options.resolved_mode_method, options.mode_capacity)
 
-    file_path = sys.argv[1]
-    case_name = _extract_case_name(file_path)
 
-    start_time = time.time()
-    numbers = read_numbers(file_path)
+def _reduce_range(
+    file_path: str, byte_range: Tuple[int, Optional[int], int], options: RunOptions
+) -> RangeState:
+    """Parse one byte range and reduce it (runs in a worker process)."""
+    start, end, first_line = byte_range
+    # In approx mode a quantile sketch replaces the value buffer so memory
+    # stays bounded; otherwise values are kept unboxed for the median.
+    state = RangeState(_new_stats(options))
+    if options.approx:
+        state.sketch = KLLSketch()
+    else:
+        state.values = array("d")
+
+    for chunk in iter_range_blocks(file_path, start, end, first_line):
+        state.stats.update(chunk)
+        if state.sketch is not None:
+            state.sketch.update(chunk)
+        else:
+            state.values.extend(chunk)
+    return state
+
 
-    if not numbers:
-        print("No valid numbers found.")
+def _reduce_ranges(
+    file_path: str, ranges: List[Tuple[int, int, int]], options: RunOptions
+) -> Iterator[RangeState]:
+    workers = min(options.workers or os.cpu_count() or 1, len(ranges))
+    if workers <= 1:
+        for byte_range in ranges:
+            yield _reduce_range(file_path, byte_range, options)
         return
 
-    results = {
-        "Mean": mean(numbers),
-        "Median": median(numbers),
-        "Mode": mode(numbers),
-        "VariancePopulation": variance_population(numbers),
-        "StdPopulation": std_population(numbers),
-    }
+    count = len(ranges)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(
+            _reduce_range, [file_path] * count, ranges, [options] * count
+        )
+
+
+class _CaseAccumulator:
+    """Merges RangeStates in file order and turns them into results."""
+
+    def __init__(self, options: RunOptions) -> None:
+        self.options = options
+        self.stats = _new_stats(options)
+        self.numbers = array("d")
+        self.sketch = KLLSketch() if options.approx else None
+        # Replaces the value buffer above MAX_EXACT_VALUES values
+        self.fallback_sketch: Optional[KLLSketch] = None
+
+    def add(self, part: RangeState) -> None:
+        self.stats.merge(part.stats)
+        if self.sketch is not None:
+            self.sketch.merge(part.sketch)
+            return
+        if self.fallback_sketch is not None:
+            self.fallback_sketch.update(part.values)
+            return
 
+        self.numbers.extend(part.values)
+        # The sort method needs every value for the mode, so it never
+        # falls back to the estimate
+        too_many = len(self.numbers) > MAX_EXACT_VALUES
+        if too_many and self.options.resolved_mode_method != "sort":
+            logging.warning(
+                "More than %s values: reporting an approximate median "
+                "and percentiles",
+                MAX_EXACT_VALUES,
+            )
+            self.fallback_sketch = KLLSketch()
+            self.fallback_sketch.update(self.numbers)
+            self.numbers = array("d")
+
+    def results(self) -> Optional[Dict[str, object]]:
+        """Final results, or None if no valid number was seen."""
+        options = self.options
+        stats = self.stats
+        numbers = self.numbers
+        if stats.count == 0:
+            return None
+
+        modes: Optional[List[float]] = None
+        # The fallback was not asked for, so its estimates say so
+        label = APPROX_LABEL if self.fallback_sketch is not None else ""
+        sketch = self.sketch or self.fallback_sketch
+        if sketch is not None:
+            median_value = sketch.quantile(0.5)
+            percentiles = {
+                _percentile_key(p) + label: sketch.quantile(p / 100)
+                for p in options.percentiles
+            }
+        else:
+            if options.resolved_mode_method == "sort":
+                # One sort serves both median and mode
+                median_value, modes = median_and_mode(numbers)
+            else:
+                # median() picks selection over sorting for large inputs
+                median_value = median(numbers)
+            percentiles = {
+                _percentile_key(p): percentile(numbers, p)
+                for p in options.percentiles
+            }
+
+        if modes is None:
+            modes = stats.mode()
+
+        mode_value: object = modes
+        if options.resolved_mode_method == "heavy" and not modes:
+            mode_value = NO_FREQUENT_VALUE
+
+        results: Dict[str, object] = {
+            "Mean": stats.mean(),
+            "Median" + label: median_value,
+            "Mode": mode_value,
+            "VariancePopulation": stats.variance_population(),
+            "StdPopulation": stats.std_population(),
+        }
+        if options.resolved_mode_method == "heavy":
+            if modes:
+                results["ModeCountBounds"] = stats.mode_bounds()
+            # Any value not listed in Mode occurs at most this many times
+            results["ModeUntrackedMaxCount"] = stats.heavy.error
+        results.update(percentiles)
+        return results
+
+
+def compute_statistics(
+    file_path: str, options: RunOptions, timer: Optional[PhaseTimer] = None
+) -> Tuple[Optional[Dict[str, object]], Optional[KLLSketch]]:
+    """
+    Compute the results of one data file (None if it has no numbers),
+    plus its quantile sketch in approx mode.
+    """
+    timer = timer or PhaseTimer()
+    # The file is cut into newline-aligned byte ranges, each reduced to
+    # a RangeState (in worker processes when there are several) and merged
+    # back in file order. The ranges do not depend on the worker count, so
+    # serial and parallel runs give identical results.
+    accumulator = _CaseAccumulator(options)
+    # Reading and parsing happen block by block inside the range reduce
+    with timer.span("reduce"):
+        ranges = split_ranges(file_path, options.range_bytes)
+        for part in _reduce_ranges(file_path, ranges, options):
+            accumulator.add(part)
+    with timer.span("compute"):
+        results = accumulator.results()
+    return results, accumulator.sketch
+
+
+def compute_incremental(
+    file_path: str,
+    options: RunOptions,
+    store: Optional[IncrementalStore] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> Tuple[Optional[Dict[str, object]], Optional[KLLSketch]]:
+    """
+    Like compute_statistics for an append-only file, but only parses the
+    bytes added since the previous run: the reducer state and the offset
+    already consumed are saved after every run. A trailing line without
+    its newline yet is counted in this run's results but not saved, so
+    it is parsed again once it is complete.
+    """
+    store = store or IncrementalStore(file_path)
+    timer = timer or PhaseTimer()
+    settings = options.cache_settings()
+    with timer.span("state"):
+        state = store.load(settings)
+    if state is None:
+        store.reset()
+        state = IncrementalState(
+            settings, _new_stats(options), KLLSketch() if options.approx else None
+        )
+
+    with timer.span("reduce"):
+        commit_end, new_lines = complete_lines_end(file_path, state.offset)
+        ranges = split_ranges(
+            file_path, options.range_bytes, state.offset, commit_end, state.next_line
+        )
+        new_values = array("d")
+        for part in _reduce_ranges(file_path, ranges, options):
+            state.stats.merge(part.stats)
+            if state.sketch is not None:
+                state.sketch.merge(part.sketch)
+            else:
+                new_values.extend(part.values)
+
+    with timer.span("state"):
+        store.append_values(new_values)
+        state.value_count += len(new_values)
+        state.offset = commit_end
+        state.next_line += new_lines
+        store.save(state)
+
+        saved_values = None
+        if state.sketch is None:
+            saved_values = store.load_values(state.value_count)
+    accumulator = _CaseAccumulator(options)
+    accumulator.add(RangeState(state.stats, saved_values, state.sketch))
+    with timer.span("reduce"):
+        pending = (state.offset, None, state.next_line)
+        accumulator.add(_reduce_range(file_path, pending, options))
+    with timer.span("compute"):
+        results = accumulator.results()
+    return results, accumulator.sketch
+
+
+def _compute_cached(
+    file_path: str, options: RunOptions, timer: PhaseTimer
+) -> Tuple[Optional[Dict[str, object]], Optional[KLLSketch]]:
+    """compute_statistics behind the on-disk cache (with --cache)."""
+    if options.incremental:
+        return compute_incremental(file_path, options, timer=timer)
+    if not options.use_cache:
+        return compute_statistics(file_path, options, timer)
+
+    cache = ResultCache()
+    with timer.span("cache"):
+        key = cache.key_for(file_path, options.cache_settings())
+        cached = cache.get(key)
+    if cached is not None:
+        logging.info(
+            "Cache hit for %s: results reused, invalid lines are not "
+            "reported again (run without --cache to see them)",
+            file_path,
+        )
+        return cached
+
+    computed = compute_statistics(file_path, options, timer)
+    with timer.span("cache"):
+        cache.put(key, computed)
+    return computed
+
+
+def run_case(file_path: str, options: RunOptions) -> CaseOutput:
+    """Compute and time one input file (also the batch worker)."""
+    timer = PhaseTimer()
+    start_time = time.time()
+    results, sketch = _compute_cached(file_path, options, timer)
     elapsed = time.time() - start_time
+    return CaseOutput(
+        _extract_case_name(file_path), results, elapsed, sketch, timer
+    )
 
-    output_lines: list[str] = []
-    output_lines.append(f"TestCase: {case_name}")
-    for key, value in results.items():
-        output_lines.append(f"{key}: {value}")
-    output_lines.append(f"ExecutionTimeSeconds: {elapsed}")
+
+def _append_results(texts: List[str]) -> None:
+    """Append all texts to the results file in one locked write."""
+    # Append so all test cases are kept in the same file
+    with locked_append(RESULTS_FILE) as file:
+        file.write("".join(text + "\n" for text in texts))
+
+
+def _write_sketch(path: str, sketches: List[Optional[KLLSketch]]) -> None:
+    """Save the merge of all sketches so later runs can fold them in."""
+    merged = KLLSketch()
+    for sketch in sketches:
+        if sketch is not None:
+            merged.merge(sketch)
+    Path(path).write_text(json.dumps(merged.to_dict()), encoding="utf-8")
+
+
+def run_batch(files: List[str], options: RunOptions) -> List[CaseOutput]:
+    """Process many files in a process pool, returning outputs in input order."""
+    workers = options.workers or os.cpu_count() or 1
+    workers = min(workers, len(files))
+    if workers <= 1:
+        return [run_case(file_path, options) for file_path in files]
+
+    # Files are already spread over processes; no nested range pools
+    per_file = replace(options, workers=1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_case, files, [per_file] * len(files)))
+
+
+def _instrumentation_text(
+    outputs: List[CaseOutput], timer: PhaseTimer, profiler: Profiler
+) -> str:
+    """Phase breakdown of the run (summed over its cases) for the results."""
+    case_names = ", ".join(output.case_name for output in outputs)
+    output_lines = [f"Instrumentation: {case_names}"]
+    output_lines.extend(timer.report_lines())
+    output_lines.extend(profiler.report_lines())
     output_lines.append("-" * 60)
+    return "\n".join(output_lines)
 
-    output_text = "\n".join(output_lines)
 
-    print(output_text)
+def main() -> None:
+    try:
+        profile_mode, argv = split_profile_args(sys.argv[1:])
+        options, files = _parse_args(argv)
+    except ValueError as exc:
+        print(f"{exc}\n{USAGE}")
+        sys.exit(1)
 
-    results_dir = Path("../results")
-    results_dir.mkdir(exist_ok=True)
+    if options.batch:
+        files = _expand_inputs(files)
 
-    # Append so all test cases are kept in the same file
-    with open(results_dir / "StatisticsResults.txt", "a", encoding="utf-8") as file:
-        file.write(output_text + "\n")
+    if not files or (len(files) != 1 and not options.batch):
+        print(USAGE)
+        sys.exit(1)
+
+    profiler = Profiler(profile_mode)
+    profiler.start()
+    try:
+        outputs = run_batch(files, options)
+    except BrokenProcessPool as exc:
+        logging.error("A statistics worker process died: %s", exc)
+        sys.exit(1)
+
+    timer = PhaseTimer()
+    for output in outputs:
+        timer.add(output.phases)
+
+    with timer.span("format"):
+        texts: List[str] = []
+        for output in outputs:
+            if output.results is None:
+                print(f"{output.case_name}: No valid numbers found.")
+                continue
+            texts.append(output.to_text())
+
+    with timer.span("write"):
+        for text in texts:
+            print(text)
+        if options.sketch_out:
+            _write_sketch(options.sketch_out, [output.sketch for output in outputs])
+    profiler.stop()
+
+    if texts:
+        # One locked append for the cases and their report, so concurrent
+        # runs never interleave them (the append itself is not timed)
+        report = _instrumentation_text(outputs, timer, profiler)
+        print(report)
+        _append_results(texts + [report])
 
 
 if __name__ == "__main__":
@@ -1,10 +1,20 @@
 import logging
-from typing import List
+import mmap
+import os
+import re
+from array import array
+from typing import Iterator, List, Optional, Tuple
 
+DEFAULT_CHUNK_SIZE = 65536
+DEFAULT_BLOCK_BYTES = 1 << 20
+DEFAULT_RANGE_BYTES = 16 << 20
+
+# Line breaks of bytes.splitlines() and of universal newlines (text mode)
+_LINE_BREAK_RE = re.compile(rb"\r\n|\r|\n")
 
-def read_numbers(path: str) -> List[float]:
-    numbers: List[float] = []
 
+def iter_numbers(path: str) -> Iterator[float]:
+    """Yield the valid numbers of a file one at a time, logging bad lines."""
     with open(path, "r", encoding="utf-8") as file:
         for line_number, line in enumerate(file, start=1):
             line = line.strip()
@@ -13,10 +23,196 @@ def read_numbers(path: str) -> List[float]:
                 continue
 
             try:
-                numbers.append(float(line))
+                yield float(line)
             except ValueError:
                 logging.error(
                     "Invalid value '%s' at line %s", line, line_number
                 )
 
-    return numbers
+
+def read_number_chunks(
+    path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[array]:
+    """
+    Yield the valid numbers of a file in blocks of at most chunk_size.
+
+    Blocks are array('d') buffers (8 bytes per value, no boxed floats);
+    NumPy users can wrap them without copying via numpy.frombuffer.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    chunk = array("d")
+    for value in iter_numbers(path):
+        chunk.append(value)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = array("d")
+
+    if chunk:
+        yield chunk
+
+
+def read_numbers(path: str) -> List[float]:
+    return list(iter_numbers(path))
+
+
+def _parse_lines_checked(lines: List[bytes], first_line: int) -> array:
+    """Line-by-line fallback that reports the exact line of each bad value."""
+    values = array("d")
+    for line_number, raw in enumerate(lines, start=first_line):
+        line = raw.decode("utf-8").strip()
+
+        if not line:
+            continue
+
+        try:
+            values.append(float(line))
+        except ValueError:
+            logging.error("Invalid value '%s' at line %s", line, line_number)
+    return values
+
+
+def parse_block(block: bytes, first_line: int = 1) -> array:
+    """
+    Parse a block of numbers, one per line, in one go. Lines end with
+    \n, \r or \r\n, as in text mode (universal newlines).
+
+    float() accepts bytes directly, so a clean block is converted with a
+    single map() and no per-line decode/strip. Any empty or invalid line
+    sends the whole block through the checked scanner, which keeps the
+    same error logging (and line numbers) as iter_numbers.
+    """
+    lines = block.splitlines()
+    try:
+        return array("d", map(float, lines))
+    except ValueError:
+        return _parse_lines_checked(lines, first_line)
+
+
+def _count_line_breaks(data: bytes) -> int:
+    return data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+
+
+def _next_line_end(mapped: mmap.mmap, position: int, end: int) -> int:
+    """Offset just past the first line break at or after position, or end."""
+    match = _LINE_BREAK_RE.search(mapped, position, end)
+    return end if match is None else match.end()
+
+
+def iter_mapped_blocks(
+    mapped: mmap.mmap,
+    start: int,
+    end: int,
+    first_line: int = 1,
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> Iterator[array]:
+    """Parse mapped[start:end] in blocks that end on a line break."""
+    line_number = first_line
+    position = start
+    while position < end:
+        block_end = _next_line_end(
+            mapped, min(position + block_bytes, end) - 1, end
+        )
+
+        block = mapped[position:block_end]
+        yield parse_block(block, line_number)
+
+        line_number += _count_line_breaks(block)
+        position = block_end
+
+
+def iter_number_blocks(
+    path: str, block_bytes: int = DEFAULT_BLOCK_BYTES
+) -> Iterator[array]:
+    """Memory-map a file and yield its valid numbers as array('d') blocks."""
+    yield from iter_range_blocks(path, 0, None, 1, block_bytes)
+
+
+def iter_range_blocks(
+    path: str,
+    start: int,
+    end: Optional[int],
+    first_line: int = 1,
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> Iterator[array]:
+    """Like iter_number_blocks, for the bytes [start, end) of a file."""
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        end = size if end is None else min(end, size)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter_mapped_blocks(mapped, start, end, first_line, block_bytes)
+
+
+def _count_lines(mapped: mmap.mmap, start: int, end: int) -> int:
+    """Line breaks in mapped[start:end], read in pieces that keep \r\n whole."""
+    count = 0
+    position = start
+    while position < end:
+        piece_end = min(position + DEFAULT_RANGE_BYTES, end)
+        if piece_end < end and mapped[piece_end - 1:piece_end + 1] == b"\r\n":
+            piece_end += 1
+        count += _count_line_breaks(mapped[position:piece_end])
+        position = piece_end
+    return count
+
+
+def split_ranges(
+    path: str,
+    range_bytes: int = DEFAULT_RANGE_BYTES,
+    start: int = 0,
+    end: Optional[int] = None,
+    first_line: int = 1,
+) -> List[Tuple[int, int, int]]:
+    """
+    Cut the bytes [start, end) of a file (default: all of it) into
+    (start, end, first_line) ranges of about range_bytes that each end on
+    a line break, so they can be parsed independently (e.g. by different
+    processes). `start` must be the beginning of a line.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            ranges: List[Tuple[int, int, int]] = []
+            line_number = first_line
+            while start < end:
+                range_end = _next_line_end(
+                    mapped, min(start + range_bytes, end) - 1, end
+                )
+                ranges.append((start, range_end, line_number))
+                line_number += _count_lines(mapped, start, range_end)
+                start = range_end
+            return ranges
+
+
+def complete_lines_end(path: str, start: int = 0) -> Tuple[int, int]:
+    """
+    Offset just past the last line break at or after `start` (or `start`
+    itself if there is none), and the number of lines in between.
+    Bytes after that offset are an unterminated line still being written.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if start >= size:
+            return start, 0
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # A final \r may be the first half of a \r\n being written
+            limit = size - 1 if mapped[size - 1:size] == b"\r" else size
+            cut = max(
+                mapped.rfind(b"\n", start, limit), mapped.rfind(b"\r", start, limit)
+            )
+            if cut == -1:
+                return start, 0
+            return cut + 1, _count_lines(mapped, start, cut + 1)
+
+
+def read_numbers_bulk(path: str) -> array:
+    values = array("d")
+    for block in iter_number_blocks(path):
+        values.extend(block)
+    return values
@@ -0,0 +1,133 @@
+import os
+import pickle
+import hashlib
+import logging
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from quantile_sketch import KLLSketch
+from result_cache import DEFAULT_CACHE_DIR
+from statistics_core import StreamingStats
+
+DEFAULT_STATE_DIR = DEFAULT_CACHE_DIR / "incremental"
+
+# Bytes hashed at the start of the file and right before the saved offset
+# to notice a rewritten or truncated input
+_FINGERPRINT_BYTES = 64 * 1024
+
+
+def _fingerprint(path: str, offset: int) -> Tuple[str, str]:
+    with open(path, "rb") as file:
+        head = file.read(min(offset, _FINGERPRINT_BYTES))
+        tail_start = max(0, offset - _FINGERPRINT_BYTES)
+        file.seek(tail_start)
+        tail = file.read(offset - tail_start)
+    return hashlib.sha256(head).hexdigest(), hashlib.sha256(tail).hexdigest()
+
+
+@dataclass
+class IncrementalState:
+    """Reducer state of the first `offset` bytes of an append-only file."""
+    settings: str
+    stats: StreamingStats
+    sketch: Optional[KLLSketch] = None
+    offset: int = 0
+    next_line: int = 1
+    value_count: int = 0
+    fingerprint: Tuple[str, str] = ("", "")
+
+
+def _has_state_shape(state: object) -> bool:
+    """Whether an unpickled object has the fields and types of a state."""
+    if not isinstance(state, IncrementalState):
+        return False
+    counters = (state.offset, state.next_line, state.value_count)
+    fingerprint = state.fingerprint
+    return (
+        isinstance(state.settings, str)
+        and isinstance(state.stats, StreamingStats)
+        and (state.sketch is None or isinstance(state.sketch, KLLSketch))
+        and all(isinstance(counter, int) and counter >= 0 for counter in counters)
+        and state.next_line >= 1
+        and isinstance(fingerprint, tuple)
+        and len(fingerprint) == 2
+        and all(isinstance(digest, str) for digest in fingerprint)
+    )
+
+
+class IncrementalStore:
+    """
+    Saved state of one input file: a pickle with the reducer state and, in
+    exact mode, a raw array('d') file with every value consumed so far
+    (appended to, never rewritten, so a run only writes its new values).
+    """
+
+    def __init__(self, file_path: str, directory: Path = DEFAULT_STATE_DIR) -> None:
+        self.file_path = file_path
+        resolved = str(Path(file_path).resolve())
+        name = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:32]
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._state_path = directory / f"{name}.state"
+        self._values_path = directory / f"{name}.values"
+
+    def load(self, settings: str) -> Optional[IncrementalState]:
+        """The saved state, or None if missing or no longer valid."""
+        try:
+            data = self._state_path.read_bytes()
+        except OSError:
+            return None
+        try:
+            state = pickle.loads(data)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Truncated, stale or foreign pickle (e.g. a class that moved
+            # raises AttributeError/ImportError): start over
+            state = None
+        if not _has_state_shape(state):
+            logging.warning("Discarding unreadable state %s", self._state_path)
+            return None
+
+        if not self._matches_input(state, settings):
+            return None
+        return state
+
+    def _matches_input(self, state: IncrementalState, settings: str) -> bool:
+        """Whether `state` covers the current file with these settings."""
+        return (
+            state.settings == settings
+            and os.path.getsize(self.file_path) >= state.offset
+            and _fingerprint(self.file_path, state.offset) == state.fingerprint
+            and (state.sketch is not None or self._values_match(state.value_count))
+        )
+
+    def _values_match(self, count: int) -> bool:
+        """Whether the values file holds exactly `count` whole values."""
+        try:
+            size = os.path.getsize(self._values_path)
+        except OSError:
+            size = 0
+        return size == count * array("d").itemsize
+
+    def reset(self) -> None:
+        for path in (self._state_path, self._values_path):
+            if path.exists():
+                path.unlink()
+
+    def append_values(self, values: array) -> None:
+        with open(self._values_path, "ab") as file:
+            values.tofile(file)
+
+    def load_values(self, count: int) -> array:
+        values = array("d")
+        if count:
+            with open(self._values_path, "rb") as file:
+                values.fromfile(file, count)
+        return values
+
+    def save(self, state: IncrementalState) -> None:
+        state.fingerprint = _fingerprint(self.file_path, state.offset)
+        temp_path = self._state_path.with_suffix(".tmp")
+        temp_path.write_bytes(pickle.dumps(state))
+        os.replace(temp_path, self._state_path)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_K = 200
+_CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Values go into a stack of compactors; a full compactor is sorted and
+    every other item is promoted to the next level with double weight.
+    Memory stays O(k log(n/k)) and the rank error of a quantile query is
+    about 1/k of the stream (roughly 0.5% with the default k=200).
+
+    Compactions alternate between keeping even and odd positions instead
+    of flipping a coin, so the same input always produces the same sketch.
+    """
+
+    def __init__(self, k: int = DEFAULT_K) -> None:
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+        self.levels: List[List[float]] = [[]]
+        self._offsets: List[int] = [0]
+
+    def _capacity(self, level: int) -> int:
+        height = len(self.levels) - level - 1
+        return int(math.ceil(self.k * _CAPACITY_DECAY ** height)) + 1
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                    self._offsets.append(0)
+
+                items.sort()
+                # An odd item out stays behind at this level
+                keep = items.pop() if len(items) % 2 else None
+                offset = self._offsets[level]
+                self._offsets[level] = 1 - offset
+                self.levels[level + 1].extend(items[offset::2])
+                items.clear()
+                if keep is not None:
+                    items.append(keep)
+            level += 1
+
+    def _track_range(self, low: float, high: float) -> None:
+        if self.min_value is None or low < self.min_value:
+            self.min_value = low
+        if self.max_value is None or high > self.max_value:
+            self.max_value = high
+
+    def add(self, value: float) -> None:
+        self._track_range(value, value)
+        self.count += 1
+        self.levels[0].append(value)
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add many values, filling level 0 in slices rather than one by one."""
+        iterator = iter(values)
+        while True:
+            block = list(islice(iterator, self.k))
+            if not block:
+                return
+            self._track_range(min(block), max(block))
+            self.count += len(block)
+            self.levels[0].extend(block)
+            if len(self.levels[0]) >= self._capacity(0):
+                self._compress()
+
+    def merge(self, other: KLLSketch) -> None:
+        """Fold another sketch into this one (e.g. from another file)."""
+        if other.k != self.k:
+            raise ValueError("Cannot merge sketches with different k")
+        if other.count == 0:
+            return
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+            self._offsets.append(0)
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+
+        self.count += other.count
+        self._track_range(other.min_value, other.max_value)
+        self._compress()
+
+    def _weighted_items(self) -> List[Tuple[float, int]]:
+        items: List[Tuple[float, int]] = []
+        for level, buffer in enumerate(self.levels):
+            weight = 1 << level
+            items.extend((value, weight) for value in buffer)
+        items.sort()
+        return items
+
+    def quantile(self, q: float) -> float:
+        """Value whose rank is approximately q * count (0 <= q <= 1)."""
+        if self.count == 0:
+            raise ValueError("Empty sketch")
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be between 0 and 1")
+        if q == 0.0:
+            return self.min_value
+        if q == 1.0:
+            return self.max_value
+
+        items = self._weighted_items()
+        total = sum(weight for _, weight in items)
+        target = q * total
+        cumulative = 0
+        for value, weight in items:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return items[-1][0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": self.min_value,
+            "max": self.max_value,
+            "levels": [list(buffer) for buffer in self.levels],
+            "offsets": list(self._offsets),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> KLLSketch:
+        sketch = cls(k=int(data["k"]))
+        sketch.levels = [
+            [float(value) for value in items] for items in data["levels"]
+        ]
+        sketch._offsets = [int(offset) for offset in data["offsets"]]
+        sketch.count = int(data["count"])
+        sketch.min_value = data["min"]
+        sketch.max_value = data["max"]
+        return sketch
@@ -0,0 +1,166 @@
+import os
+import json
+import pickle
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: index updates are simply not locked
+    fcntl = None
+
+# Bump when the cached payload or the way results are computed changes
+CACHE_VERSION = 3
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_HASH_CHUNK = 1 << 20
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of the file content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write through a temp file + rename so readers never see half a file."""
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(data)
+        os.replace(temp_name, path)
+    except OSError:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+class ResultCache:
+    """
+    On-disk cache of computed results, keyed by input content.
+
+    The content hash of each input is remembered together with its size
+    and mtime, so an unchanged file is recognised from a stat() alone and
+    only new or modified files are hashed again. Entries are evicted
+    least-recently-used first (by file mtime, refreshed on every hit) once
+    their total size goes over max_bytes. Batch workers share the
+    directory, so index updates and evictions hold an flock on a lock file.
+    """
+
+    def __init__(
+        self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries = self.directory / "entries"
+        self._index_path = self.directory / "index.json"
+        self._lock_path = self.directory / "index.lock"
+        self._entries.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Exclusive lock across processes for read-modify-write updates."""
+        with open(self._lock_path, "a", encoding="utf-8") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_index(self) -> Dict[str, Dict[str, object]]:
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def content_hash(self, file_path: str) -> str:
+        resolved = str(Path(file_path).resolve())
+        stat = os.stat(resolved)
+
+        known = self._load_index().get(resolved)
+        unchanged = (
+            known is not None
+            and known["size"] == stat.st_size
+            and known["mtime_ns"] == stat.st_mtime_ns
+        )
+        if unchanged:
+            return str(known["sha256"])
+
+        digest = hash_file(resolved)
+        # Reload under the lock: other workers may have added entries
+        # since the read above, and rewriting a stale copy would drop them
+        with self._locked():
+            index = self._load_index()
+            index[resolved] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest,
+            }
+            _write_atomic(self._index_path, json.dumps(index).encode("utf-8"))
+        return digest
+
+    def key_for(self, file_path: str, settings: str) -> str:
+        """Cache key of one input file computed with the given settings."""
+        raw = f"{CACHE_VERSION}:{self.content_hash(file_path)}:{settings}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[object]:
+        path = self._entries / f"{key}.pickle"
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            payload = pickle.loads(data)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Truncated, stale or foreign pickle (e.g. a class that moved
+            # raises AttributeError/ImportError): a miss, and the entry goes
+            logging.warning("Discarding unreadable cache entry %s", path)
+            self._discard(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key: str, payload: object) -> None:
+        _write_atomic(self._entries / f"{key}.pickle", pickle.dumps(payload))
+        with self._locked():
+            self._evict()
+
+    @staticmethod
+    def _discard(path: Path) -> bool:
+        try:
+            path.unlink()
+        except OSError:
+            logging.warning("Could not evict cache entry %s", path)
+            return False
+        return True
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._entries.glob("*.pickle"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self._discard(path):
+                total -= size
@@ -1,15 +1,152 @@
+import heapq
 import math
-from typing import List, Dict
+import operator
+import os
+import random
+from collections import Counter
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python backend always works
+    np = None
 
-def mean(data: List[float]) -> float:
-    total = 0.0
-    for value in data:
-        total += value
-    return total / len(data)
+
+def neumaier_add(
+    total: float, compensation: float, value: float
+) -> Tuple[float, float]:
+    """
+    One step of Neumaier's compensated summation: add `value` to the
+    running (total, compensation) pair and return the new pair. The low
+    order bits lost by `total + value` are kept in the compensation, so the
+    error stays O(eps) regardless of how many values are added.
+    """
+    result = total + value
+    if abs(total) >= abs(value):
+        compensation += (total - result) + value
+    else:
+        compensation += (value - result) + total
+    return result, compensation
+
+
+def _mean_python(data: Sequence[float]) -> float:
+    # math.fsum is exactly rounded and runs in C, so it is both more
+    # accurate and faster than a Python-level `total += value` loop
+    return math.fsum(data) / len(data)
+
+
+# Values summarised at a time by StreamingStats.update
+_UPDATE_BLOCK = 65536
+
+# Below this size a C-level sort beats the Python-level selection loop.
+SELECT_THRESHOLD = 10_000
+_SMALL_SELECT = 32
+
+# Windows sampled to tell run-structured input (sorted, reversed,
+# organ-pipe, sawtooth...) from shuffled input; Timsort is near-linear on
+# the former, where it beats selection by 10x or more
+_RUN_WINDOWS = 32
+_RUN_WINDOW_SIZE = 16
+# Sampled windows and pivot positions only; results never depend on them
+_SAMPLE_RNG = random.Random(0x5E1EC7)
+
+
+def _is_run_structured(data: Sequence[float]) -> bool:
+    """Whether most sampled windows of the data are monotonic runs."""
+    last_start = len(data) - _RUN_WINDOW_SIZE
+    if last_start < 0:
+        return False
+    monotonic = 0
+    for _ in range(_RUN_WINDOWS):
+        start = _SAMPLE_RNG.randint(0, last_start)
+        window = data[start:start + _RUN_WINDOW_SIZE]
+        ascending = all(map(operator.le, window, islice(window, 1, None)))
+        if ascending or all(map(operator.ge, window, islice(window, 1, None))):
+            monotonic += 1
+    return monotonic * 4 >= _RUN_WINDOWS * 3
+
+
+def _median_of_three(values: Sequence[float]) -> float:
+    # Random positions: fixed ones (first, middle, last) give bad pivots
+    # on organ-pipe or periodic data
+    n = len(values)
+    return sorted(values[_SAMPLE_RNG.randrange(n)] for _ in range(3))[1]
+
+
+def _median_of_medians(values: Sequence[float]) -> float:
+    """Deterministic pivot: the median of the medians of groups of five."""
+    medians = []
+    for start in range(0, len(values), 5):
+        group = sorted(values[start:start + 5])
+        medians.append(group[(len(group) - 1) // 2])
+    return _select(medians, (len(medians) - 1) // 2, budget=0)
+
+
+def _select(values: Sequence[float], k: int, budget: int) -> float:
+    """
+    Introselect: quickselect with a cheap median-of-three pivot, switching
+    to median-of-medians pivots once `budget` unbalanced partitions have
+    been seen, which keeps adversarial inputs linear.
+    """
+    while len(values) > _SMALL_SELECT:
+        if budget > 0:
+            pivot = _median_of_three(values)
+        else:
+            pivot = _median_of_medians(values)
+
+        lows = [value for value in values if value < pivot]
+        if k < len(lows):
+            kept = lows
+        else:
+            equal = len(values) - len(lows)
+            highs = [value for value in values if value > pivot]
+            equal -= len(highs)
+            if k < len(lows) + equal:
+                return pivot
+            k -= len(lows) + equal
+            kept = highs
+
+        if len(kept) > 3 * len(values) // 4:
+            budget -= 1
+        values = kept
+
+    return sorted(values)[k]
+
+
+def select_kth(data: Sequence[float], k: int) -> float:
+    """
+    Return the k-th smallest value (0-based): selection in linear time,
+    or a sort when the input is made of runs (see _is_run_structured).
+    """
+    if not 0 <= k < len(data):
+        raise IndexError("k out of range")
+    if _is_run_structured(data):
+        return sorted(data)[k]
+    return _select(data, k, budget=2 * len(data).bit_length())
+
+
+def median_select(data: Sequence[float]) -> float:
+    """
+    Median by selection: no full sort and no sorted copy of the data,
+    except for run-structured input, which Timsort handles near-linearly.
+    """
+    n = len(data)
+    if _is_run_structured(data):
+        return _median_sorted(data)
+    lower = select_kth(data, (n - 1) // 2)
+    if n % 2 == 1:
+        return lower
+
+    # The upper middle is either a duplicate of lower or the next value up
+    at_most_lower = len([value for value in data if value <= lower])
+    if at_most_lower > n // 2:
+        return lower
+    upper = min(value for value in data if value > lower)
+    return (lower + upper) / 2
 
 
-def median(data: List[float]) -> float:
+def _median_sorted(data: Sequence[float]) -> float:
     sorted_data = sorted(data)
     n = len(sorted_data)
 
@@ -21,7 +158,21 @@ def median(data: List[float]) -> float:
     return (mid1 + mid2) / 2
 
 
-def mode(data: List[float]) -> List[float]:
+def _median_python(data: Sequence[float]) -> float:
+    if len(data) > SELECT_THRESHOLD:
+        return median_select(data)
+    return _median_sorted(data)
+
+
+def percentile(data: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile (0 < p <= 100) found by selection."""
+    if not 0.0 < p <= 100.0:
+        raise ValueError("p must be in (0, 100]")
+    rank = math.ceil(p / 100 * len(data))
+    return select_kth(data, max(rank, 1) - 1)
+
+
+def _mode_python(data: Sequence[float]) -> List[float]:
     freq: Dict[float, int] = {}
 
     for value in data:
@@ -40,8 +191,8 @@ def mode(data: List[float]) -> List[float]:
     return modes
 
 
-def variance_population(data: List[float]) -> float:
-    avg = mean(data)
+def _variance_python(data: Sequence[float]) -> float:
+    avg = _mean_python(data)
     total = 0.0
 
     for value in data:
@@ -50,5 +201,376 @@ def variance_population(data: List[float]) -> float:
     return total / len(data)
 
 
-def std_population(data: List[float]) -> float:
+def _as_array(data: Sequence[float]):
+    return np.asarray(data, dtype=np.float64)
+
+
+# Columns of the compensated NumPy sum (one row of values per step)
+_SUM_BLOCK = 8192
+
+
+def _compensated_sum_numpy(values) -> float:
+    """
+    Sum of a float64 array without unboxing it. The values are laid out
+    in rows of _SUM_BLOCK and added row by row with a vectorised TwoSum,
+    so every column keeps the exact rounding error of its running total;
+    the column totals and errors are then combined by math.fsum. The
+    error is at most about eps * |sum| + rows * eps**2 * sum(|x|), against
+    log2(n) * eps * sum(|x|) for the pairwise np.sum.
+    """
+    rows = len(values) // _SUM_BLOCK
+    tail = values[rows * _SUM_BLOCK:].tolist()
+    if rows == 0:
+        return math.fsum(tail)
+
+    total = values[:_SUM_BLOCK].copy()
+    errors = np.zeros(_SUM_BLOCK)
+    for row in range(1, rows):
+        value = values[row * _SUM_BLOCK:(row + 1) * _SUM_BLOCK]
+        result = total + value
+        virtual = result - total
+        errors += (total - (result - virtual)) + (value - virtual)
+        total = result
+    return math.fsum(total.tolist() + errors.tolist() + tail)
+
+
+def _mean_numpy(data: Sequence[float]) -> float:
+    # np.mean only uses pairwise summation, which loses small values
+    # next to large ones that cancel later
+    values = _as_array(data)
+    return _compensated_sum_numpy(values) / len(values)
+
+
+def _median_numpy(data: Sequence[float]) -> float:
+    values = _as_array(data)
+    n = len(values)
+    if n % 2 == 1:
+        return float(np.partition(values, n // 2)[n // 2])
+
+    middle = np.partition(values, (n // 2 - 1, n // 2))
+    return (float(middle[n // 2 - 1]) + float(middle[n // 2])) / 2
+
+
+def _mode_numpy(data: Sequence[float]) -> List[float]:
+    values, first_index, counts = np.unique(
+        _as_array(data), return_index=True, return_counts=True
+    )
+    top = counts == counts.max()
+    # Same order as the dict version: by first occurrence in the data
+    order = np.argsort(first_index[top], kind="stable")
+    return values[top][order].tolist()
+
+
+def _variance_numpy(data: Sequence[float]) -> float:
+    return float(np.var(_as_array(data)))
+
+
+_BACKENDS: Dict[str, Dict[str, Callable]] = {
+    "python": {
+        "mean": _mean_python,
+        "median": _median_python,
+        "mode": _mode_python,
+        "variance_population": _variance_python,
+    },
+}
+if np is not None:
+    _BACKENDS["numpy"] = {
+        "mean": _mean_numpy,
+        "median": _median_numpy,
+        "mode": _mode_numpy,
+        "variance_population": _variance_numpy,
+    }
+
+
+def available_backends() -> List[str]:
+    return list(_BACKENDS)
+
+
+def get_backend(name: str) -> Dict[str, Callable]:
+    """Functions of one backend by name ("python" or "numpy")."""
+    if name not in _BACKENDS:
+        raise ValueError(f"Backend not available: {name}")
+    return _BACKENDS[name]
+
+
+# Picked once at import: NumPy when installed, unless STATISTICS_BACKEND
+# forces one explicitly.
+BACKEND = os.environ.get(
+    "STATISTICS_BACKEND", "numpy" if np is not None else "python"
+)
+_ACTIVE = get_backend(BACKEND)
+
+
+def mean(data: Sequence[float]) -> float:
+    return _ACTIVE["mean"](data)
+
+
+def median(data: Sequence[float]) -> float:
+    return _ACTIVE["median"](data)
+
+
+def mode(data: Sequence[float]) -> List[float]:
+    return _ACTIVE["mode"](data)
+
+
+def variance_population(data: Sequence[float]) -> float:
+    return _ACTIVE["variance_population"](data)
+
+
+def std_population(data: Sequence[float]) -> float:
     return math.sqrt(variance_population(data))
+
+
+DEFAULT_MODE_CAPACITY = 1000
+MODE_METHODS = ("table", "sort", "heavy")
+
+
+def modes_of_sorted(sorted_data: Sequence[float]) -> List[float]:
+    """Modes of already sorted data by a run-length scan (ascending order)."""
+    modes: List[float] = []
+    best = 0
+    run = 0
+    previous = None
+    for value in sorted_data:
+        run = run + 1 if run and value == previous else 1
+        previous = value
+        if run > best:
+            best = run
+            modes = [value]
+        elif run == best:
+            modes.append(value)
+    return modes
+
+
+def median_and_mode(data: Sequence[float]) -> Tuple[float, List[float]]:
+    """
+    Median and modes from a single sort, with no frequency table.
+    Ties among modes come out in ascending order.
+    """
+    sorted_data = sorted(data)
+    n = len(sorted_data)
+    if n % 2 == 1:
+        middle = sorted_data[n // 2]
+    else:
+        middle = (sorted_data[n // 2 - 1] + sorted_data[n // 2]) / 2
+    return middle, modes_of_sorted(sorted_data)
+
+
+class HeavyHitters:
+    """
+    Mergeable Misra-Gries summary keeping at most `capacity` counters.
+
+    Exact counts of each block are added in, and when there are more than
+    `capacity` values the (capacity+1)-th largest count is subtracted from
+    every counter; `error` is the sum of those subtractions. For every
+    value, counter <= true count <= counter + error, and
+    error <= n / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_MODE_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counters: Dict[float, int] = {}
+        self.error = 0
+
+    def _absorb(self, counts: Dict[float, int]) -> None:
+        counters = self.counters
+        shared = counters.keys() & counts.keys()
+        summed = {value: counters[value] + counts[value] for value in shared}
+        counters.update(counts)
+        counters.update(summed)
+
+        if len(counters) > self.capacity:
+            cut = heapq.nlargest(self.capacity + 1, counters.values())[-1]
+            self.error += cut
+            self.counters = {
+                value: count - cut for value, count in counters.items() if count > cut
+            }
+
+    def update(self, values: Iterable[float]) -> None:
+        iterator = iter(values)
+        while True:
+            block = list(islice(iterator, _UPDATE_BLOCK))
+            if not block:
+                return
+            self._absorb(Counter(block))
+
+    def merge(self, other: "HeavyHitters") -> None:
+        if other.capacity != self.capacity:
+            raise ValueError("Cannot merge summaries with different capacity")
+        self.error += other.error
+        self._absorb(other.counters)
+
+    def candidates(self) -> List[Tuple[float, int, int]]:
+        """
+        (value, lower, upper) count bounds of every value that may be the
+        mode, i.e. whose upper bound reaches the best lower bound. With no
+        subtraction so far (error == 0) these are exactly the modes. Empty
+        when the subtractions cancelled out every counter: then no value
+        occurs more than error <= n / (capacity + 1) times.
+        """
+        if not self.counters:
+            return []
+        best = max(self.counters.values())
+        found = [
+            (value, count, count + self.error)
+            for value, count in self.counters.items()
+            if count + self.error >= best
+        ]
+        found.sort(key=lambda item: -item[1])
+        return found
+
+
+class StreamingStats:
+    """
+    Single-pass accumulator for mean, variance, std and mode.
+
+    Moments use Welford's update (count, mean, M2) so they need constant
+    memory; the sum behind mean() is exact per block (math.fsum) and
+    carried across blocks and merges with Neumaier compensation. The mode
+    depends on mode_method:
+    - "table": exact frequency table of the distinct values (default).
+    - "heavy": bounded HeavyHitters summary with guaranteed count bounds.
+    - "sort": not tracked here; the caller sorts the data once for both
+      median and mode (see median_and_mode).
+    """
+
+    def __init__(
+        self,
+        mode_method: str = "table",
+        mode_capacity: int = DEFAULT_MODE_CAPACITY,
+    ) -> None:
+        if mode_method not in MODE_METHODS:
+            raise ValueError(f"Unknown mode method: {mode_method}")
+        self.count = 0
+        self.total = 0.0
+        self.compensation = 0.0
+        self.running_mean = 0.0
+        self.m2 = 0.0
+        self.freq: Optional[Dict[float, int]] = {} if mode_method == "table" else None
+        self.heavy = HeavyHitters(mode_capacity) if mode_method == "heavy" else None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total, self.compensation = neumaier_add(
+            self.total, self.compensation, value
+        )
+
+        delta = value - self.running_mean
+        self.running_mean += delta / self.count
+        self.m2 += delta * (value - self.running_mean)
+
+        if self.freq is not None:
+            if value in self.freq:
+                self.freq[value] += 1
+            else:
+                self.freq[value] = 1
+        elif self.heavy is not None:
+            self.heavy.update((value,))
+
+    def update(self, values: Iterable[float]) -> None:
+        """
+        Add many values. Each block is summarised with C-level helpers
+        (sum, Counter) and folded in with merge(), avoiding a Python-level
+        add() call per value.
+        """
+        iterator = iter(values)
+        while True:
+            block = list(islice(iterator, _UPDATE_BLOCK))
+            if not block:
+                return
+            self.merge(self.from_block(block, self))
+
+    @classmethod
+    def from_block(
+        cls, block: Sequence[float], like: Optional["StreamingStats"] = None
+    ) -> "StreamingStats":
+        """Summarise a block; `like` supplies the mode settings to copy."""
+        part = cls()
+        part.freq = None
+        if like is None or like.freq is not None:
+            part.freq = dict(Counter(block))
+        elif like.heavy is not None:
+            part.heavy = HeavyHitters(like.heavy.capacity)
+            part.heavy.update(block)
+
+        if not block:
+            return part
+        part.count = len(block)
+        part.total = math.fsum(block)
+        part.running_mean = part.total / part.count
+        center = part.running_mean
+        part.m2 = sum((value - center) * (value - center) for value in block)
+        return part
+
+    def merge(self, other: "StreamingStats") -> None:
+        """
+        Fold in the state of another accumulator (Chan et al. parallel
+        variance), e.g. one filled by a worker from another part of a file.
+        """
+        if other.count == 0:
+            return
+
+        if self.freq is not None:
+            self._merge_freq(other.freq)
+        elif self.heavy is not None:
+            self.heavy.merge(other.heavy)
+
+        if self.count == 0:
+            self.count = other.count
+            self.total = other.total
+            self.compensation = other.compensation
+            self.running_mean = other.running_mean
+            self.m2 = other.m2
+            return
+
+        count = self.count + other.count
+        delta = other.running_mean - self.running_mean
+        self.running_mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total, self.compensation = neumaier_add(
+            self.total, self.compensation, other.total
+        )
+        self.compensation += other.compensation
+
+    def _merge_freq(self, other_freq: Dict[float, int]) -> None:
+        # Only shared values need a Python-level add; dict.update keeps
+        # the position of existing keys, so first-seen order is preserved.
+        freq = self.freq
+        shared = freq.keys() & other_freq.keys()
+        summed = {value: freq[value] + other_freq[value] for value in shared}
+        freq.update(other_freq)
+        freq.update(summed)
+
+    def mean(self) -> float:
+        return (self.total + self.compensation) / self.count
+
+    def variance_population(self) -> float:
+        return self.m2 / self.count
+
+    def std_population(self) -> float:
+        return math.sqrt(self.variance_population())
+
+    def mode(self) -> List[float]:
+        if self.heavy is not None:
+            return [value for value, _, _ in self.heavy.candidates()]
+        if self.freq is None:
+            raise ValueError("Mode is not tracked with mode_method='sort'")
+        max_count = max(self.freq.values())
+        return [key for key, count in self.freq.items() if count == max_count]
+
+    def mode_bounds(self) -> List[Tuple[int, int]]:
+        """Guaranteed (lower, upper) counts of each value from mode()."""
+        if self.heavy is not None:
+            return [(low, high) for _, low, high in self.heavy.candidates()]
+        max_count = max(self.freq.values())
+        return [(max_count, max_count) for _ in self.mode()]
+
+
+def compute_streaming(values: Iterable[float]) -> StreamingStats:
+    """Consume an iterable of numbers once and return the filled accumulator."""
+    stats = StreamingStats()
+    stats.update(values)
+    return stats
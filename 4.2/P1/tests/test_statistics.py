@@ -1,10 +1,71 @@
-from statistics_core import mean, median, mode, variance_population
+import json
+import logging
+import math
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import computeStatistics
+from computeStatistics import (
+    RunOptions,
+    _parse_args,
+    compute_incremental,
+    compute_statistics,
+    run_batch,
+    run_case,
+)
+from file_utils import (
+    iter_number_blocks,
+    iter_numbers,
+    read_number_chunks,
+    read_numbers,
+    read_numbers_bulk,
+)
+from incremental_state import IncrementalStore
+from instrumentation import PROFILE_ENV, split_profile_args
+from quantile_sketch import KLLSketch
+from result_cache import ResultCache
+from statistics_core import (
+    HeavyHitters,
+    StreamingStats,
+    _is_run_structured,
+    available_backends,
+    compute_streaming,
+    get_backend,
+    mean,
+    median,
+    median_and_mode,
+    median_select,
+    mode,
+    percentile,
+    select_kth,
+    std_population,
+    variance_population,
+)
 
 
 def test_mean():
     assert mean([1, 2, 3, 4]) == 2.5
 
 
+def test_mean_is_compensated():
+    # Naive left-to-right summation returns 0.0 here
+    data = [1e16, 1.0, -1e16, 1.0] * 1000
+    assert mean(data) == 0.5
+
+    added = StreamingStats()
+    for value in data:
+        added.add(value)
+    assert added.mean() == 0.5
+
+    merged = StreamingStats.from_block(data[:2000])
+    merged.merge(StreamingStats.from_block(data[2000:]))
+    assert merged.mean() == 0.5
+
+
 def test_median_even():
     assert median([1, 2, 3, 4]) == 2.5
 
@@ -15,3 +76,419 @@ def test_mode():
 
 def test_variance():
     assert round(variance_population([1, 2, 3]), 5) == round(2 / 3, 5)
+
+
+def test_streaming_matches_batch_functions():
+    data = [4.0, 1.0, 4.0, 7.5, 1.0, 2.0]
+    stats = compute_streaming(iter(data))
+
+    assert stats.count == len(data)
+    assert stats.mean() == mean(data)
+    assert math.isclose(stats.variance_population(), variance_population(data))
+    assert math.isclose(stats.std_population(), std_population(data))
+    assert stats.mode() == mode(data)
+
+
+def test_read_number_chunks_blocks_and_skips_invalid(tmp_path):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("1\n2\n\nabc\n3\n4\n5\n", encoding="utf-8")
+
+    chunks = list(read_number_chunks(str(data_file), chunk_size=2))
+
+    assert [list(chunk) for chunk in chunks] == [[1.0, 2.0], [3.0, 4.0], [5.0]]
+    assert list(iter_numbers(str(data_file))) == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_median_select_matches_sorted_median():
+    rng = random.Random(7)
+    data = [float(rng.randint(0, 50)) for _ in range(1001)]
+
+    for sample in (data, data[:-1], sorted(data), sorted(data, reverse=True)):
+        assert median_select(sample) == median(list(sample))
+
+
+def test_median_select_sorts_run_structured_input():
+    rising = [float(i) for i in range(20000)]
+    organ_pipe = rising + rising[::-1]
+    sawtooth = [float(i % 100) for i in range(30001)]
+    shuffled = organ_pipe[:]
+    random.Random(4).shuffle(shuffled)
+
+    assert _is_run_structured(organ_pipe)
+    assert _is_run_structured(sawtooth)
+    assert not _is_run_structured(shuffled)
+    for data in (organ_pipe, sawtooth, shuffled):
+        ordered = sorted(data)
+        assert median_select(data) == median(ordered)
+        assert select_kth(data, 12345) == ordered[12345]
+
+
+def test_select_kth_handles_duplicates():
+    data = [5.0] * 100 + [1.0, 9.0]
+    assert select_kth(data, 0) == 1.0
+    assert select_kth(data, 50) == 5.0
+    assert select_kth(data, 101) == 9.0
+
+
+def test_percentile_nearest_rank():
+    data = [float(value) for value in range(1, 101)]
+    assert percentile(data, 50) == 50.0
+    assert percentile(data, 90) == 90.0
+    assert percentile(data, 100) == 100.0
+
+
+def test_kll_sketch_quantiles_within_error_bound():
+    rng = random.Random(11)
+    data = [rng.uniform(0, 1000) for _ in range(50000)]
+    sketch = KLLSketch()
+    sketch.update(data)
+
+    ordered = sorted(data)
+    for q in (0.5, 0.9, 0.99):
+        rank = ordered.index(sketch.quantile(q))
+        assert abs(rank - q * len(data)) < 0.02 * len(data)
+
+
+def test_kll_sketch_merge_and_round_trip():
+    rng = random.Random(5)
+    left_data = [rng.gauss(0, 1) for _ in range(20000)]
+    right_data = [rng.gauss(5, 1) for _ in range(20000)]
+
+    left = KLLSketch()
+    left.update(left_data)
+    right = KLLSketch.from_dict(json.loads(json.dumps(_sketch_of(right_data))))
+    left.merge(right)
+
+    ordered = sorted(left_data + right_data)
+    assert left.count == len(ordered)
+    assert left.quantile(0.0) == ordered[0]
+    assert left.quantile(1.0) == ordered[-1]
+    rank = ordered.index(left.quantile(0.5))
+    assert abs(rank - len(ordered) / 2) < 0.02 * len(ordered)
+
+
+def _sketch_of(values):
+    sketch = KLLSketch()
+    sketch.update(values)
+    return sketch.to_dict()
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+TEST_CASES = sorted(path.name for path in DATA_DIR.glob("TC*.txt"))
+
+
+@pytest.mark.skipif(
+    "numpy" not in available_backends(), reason="NumPy is not installed"
+)
+@pytest.mark.parametrize("case", TEST_CASES)
+def test_numpy_backend_matches_python_backend(case):
+    data = read_numbers(str(DATA_DIR / case))
+    python = get_backend("python")
+    vectorised = get_backend("numpy")
+
+    assert vectorised["median"](data) == python["median"](data)
+    assert vectorised["mode"](data) == python["mode"](data)
+    for name in ("mean", "variance_population"):
+        assert math.isclose(
+            vectorised[name](data), python[name](data), rel_tol=1e-12
+        )
+
+
+@pytest.mark.skipif(
+    "numpy" not in available_backends(), reason="NumPy is not installed"
+)
+def test_numpy_mean_is_compensated_across_rows():
+    # Many _SUM_BLOCK rows plus a tail; the pairwise np.sum is off here
+    data = [1e16, 1.0, -1e16, 1.0] * 25_001 + [3.0]
+    assert get_backend("numpy")["mean"](data) == math.fsum(data) / len(data)
+
+
+@pytest.mark.parametrize("case", TEST_CASES)
+def test_bulk_reader_matches_line_reader(case):
+    path = str(DATA_DIR / case)
+    blocks = list(iter_number_blocks(path, block_bytes=256))
+
+    assert len(blocks) > 1
+    assert [value for block in blocks for value in block] == read_numbers(path)
+
+
+def test_bulk_reader_reports_invalid_line_numbers(tmp_path, caplog):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("1\n2\n\n3\nabc\n4\n5.5\nx1\n6", encoding="utf-8")
+
+    with caplog.at_level(logging.ERROR):
+        values = list(read_numbers_bulk(str(data_file)))
+
+    assert values == [1.0, 2.0, 3.0, 4.0, 5.5, 6.0]
+    assert "'abc' at line 5" in caplog.text
+    assert "'x1' at line 8" in caplog.text
+
+
+def test_bulk_reader_splits_cr_and_crlf_lines(tmp_path, caplog):
+    data_file = tmp_path / "data.txt"
+    data_file.write_bytes(b"1\r2\r3\r\n4\r\nabc\r5\n")
+    path = str(data_file)
+
+    with caplog.at_level(logging.ERROR):
+        blocks = list(iter_number_blocks(path, block_bytes=2))
+    assert [value for block in blocks for value in block] == read_numbers(path)
+    assert read_numbers(path) == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert "'abc' at line 5" in caplog.text
+
+    results, _ = compute_statistics(path, RunOptions(workers=1, range_bytes=3))
+    assert results["Mean"] == 3.0
+
+
+def test_run_batch_keeps_input_order():
+    files = [str(DATA_DIR / case) for case in ("TC3.txt", "TC1.txt", "TC2.txt")]
+    options = RunOptions(batch=True, workers=2, use_cache=False)
+
+    outputs = run_batch(files, options)
+
+    assert [output.case_name for output in outputs] == ["TC3", "TC1", "TC2"]
+    for output, path in zip(outputs, files):
+        assert output.results == run_case(path, options).results
+
+
+def test_streaming_stats_merge_matches_single_pass():
+    data = [float(value % 17) * 1.5 for value in range(1000)]
+    left = compute_streaming(data[:300])
+    left.merge(compute_streaming(data[300:]))
+    whole = compute_streaming(data)
+
+    assert left.count == whole.count
+    assert math.isclose(left.mean(), whole.mean())
+    assert math.isclose(left.variance_population(), whole.variance_population())
+    assert left.mode() == whole.mode()
+
+
+@pytest.mark.parametrize("case", ["TC3.txt", "TC5.txt", "TC7.txt"])
+def test_parallel_ranges_match_serial(case):
+    path = str(DATA_DIR / case)
+    serial, _ = compute_statistics(path, RunOptions(workers=1, range_bytes=4096))
+    parallel, _ = compute_statistics(path, RunOptions(workers=3, range_bytes=4096))
+    single_range, _ = compute_statistics(path, RunOptions(workers=1))
+
+    assert parallel == serial
+    assert serial["Median"] == single_range["Median"]
+    assert serial["Mode"] == single_range["Mode"]
+    assert math.isclose(serial["Mean"], single_range["Mean"])
+
+
+def test_median_and_mode_share_one_sort():
+    middle, modes = median_and_mode([3.0, 1.0, 3.0, 2.0, 1.0, 5.0])
+    assert middle == 2.5
+    assert modes == [1.0, 3.0]
+
+
+def test_heavy_hitters_bounds_hold():
+    rng = random.Random(9)
+    data = [rng.uniform(0, 1) for _ in range(5000)] + [42.0] * 300 + [7.0] * 250
+    rng.shuffle(data)
+    summary = HeavyHitters(capacity=50)
+    summary.update(data[:3000])
+    other = HeavyHitters(capacity=50)
+    other.update(data[3000:])
+    summary.merge(other)
+
+    candidates = summary.candidates()
+    assert candidates[0][0] == 42.0
+    for value, low, high in candidates:
+        assert low <= data.count(value) <= high
+    assert summary.error <= len(data) / 51
+
+
+def test_heavy_mode_is_exact_without_overflow():
+    stats = StreamingStats(mode_method="heavy", mode_capacity=10)
+    stats.update([1.0, 2.0, 2.0, 3.0, 3.0])
+    assert stats.mode() == [2.0, 3.0]
+    assert stats.mode_bounds() == [(2, 2), (2, 2)]
+
+
+def test_heavy_mode_of_distinct_values_says_none_is_frequent(tmp_path):
+    summary = HeavyHitters(capacity=10)
+    summary.update(float(value) for value in range(1000))
+    assert summary.candidates() == []
+    assert summary.error <= 1000 / 11
+
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("".join(f"{i}\n" for i in range(1000)), encoding="utf-8")
+    options = RunOptions(workers=1, approx=True, mode_capacity=10)
+    results, _ = compute_statistics(str(data_file), options)
+    assert results["Mode"] == computeStatistics.NO_FREQUENT_VALUE
+    assert "ModeCountBounds" not in results
+    assert results["ModeUntrackedMaxCount"] <= 1000 / 11
+
+
+def test_result_cache_hit_and_invalidation(tmp_path):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("1\n2\n2\n", encoding="utf-8")
+    cache = ResultCache(tmp_path / "cache")
+
+    key = cache.key_for(str(data_file), "settings")
+    assert cache.get(key) is None
+    cache.put(key, ({"Mean": 5 / 3}, None))
+    assert cache.get(key) == ({"Mean": 5 / 3}, None)
+    assert cache.key_for(str(data_file), "other settings") != key
+
+    data_file.write_text("1\n2\n3\n", encoding="utf-8")
+    assert cache.key_for(str(data_file), "settings") != key
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=2500)
+    for number in range(5):
+        cache.put(f"key{number}", "x" * 1000)
+
+    assert cache.get("key4") == "x" * 1000
+    assert cache.get("key0") is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"cno_such_module\nThing\n.", b"cmath\nno_such_attr\n.", b"\x80\x04trunc"],
+)
+def test_result_cache_unreadable_entry_is_a_miss(tmp_path, data):
+    cache = ResultCache(tmp_path / "cache")
+    entry = tmp_path / "cache" / "entries" / "stale.pickle"
+    entry.write_bytes(data)
+
+    assert cache.get("stale") is None
+    assert not entry.exists()
+
+
+def _hash_into_cache(args):
+    directory, file_path = args
+    return ResultCache(Path(directory)).content_hash(file_path)
+
+
+def test_result_cache_index_keeps_concurrent_updates(tmp_path):
+    files = []
+    for number in range(24):
+        data_file = tmp_path / f"data{number}.txt"
+        data_file.write_text(f"{number}\n", encoding="utf-8")
+        files.append(str(data_file.resolve()))
+    directory = str(tmp_path / "cache")
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_hash_into_cache, [(directory, path) for path in files]))
+
+    index = json.loads((tmp_path / "cache" / "index.json").read_text(encoding="utf-8"))
+    assert sorted(index) == sorted(files)
+
+
+def test_run_case_does_not_use_the_cache_by_default(tmp_path, caplog):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("1\nbad\n3\n", encoding="utf-8")
+
+    for _ in range(2):
+        with caplog.at_level(logging.ERROR):
+            run_case(str(data_file), RunOptions())
+    assert sum("line 2" in record.getMessage() for record in caplog.records) == 2
+
+
+def test_approx_uses_the_bounded_mode():
+    options, files = _parse_args(["--approx", "data.txt"])
+    assert files == ["data.txt"]
+    assert options.resolved_mode_method == "heavy"
+    assert _parse_args(["data.txt"])[0].resolved_mode_method == "table"
+    with pytest.raises(ValueError):
+        _parse_args(["--approx", "--mode-method", "table", "data.txt"])
+
+
+def test_fallback_answers_median_and_percentiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(computeStatistics, "MAX_EXACT_VALUES", 100)
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("".join(f"{i}\n" for i in range(1, 1001)), encoding="utf-8")
+
+    options = RunOptions(workers=1, percentiles=[10.0, 90.0])
+    results, _ = compute_statistics(str(data_file), options)
+    assert "Median" not in results
+    assert abs(results["Median (approx)"] - 500) <= 20
+    assert abs(results["P10 (approx)"] - 100) <= 20
+    assert abs(results["P90 (approx)"] - 900) <= 20
+
+
+def test_incremental_run_parses_only_appended_data(tmp_path, caplog):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("4\n1\n4\n2\n", encoding="utf-8")
+    options = RunOptions(workers=1)
+    store = IncrementalStore(str(data_file), tmp_path / "state")
+
+    first, _ = compute_incremental(str(data_file), options, store)
+    assert first["Mode"] == [4.0]
+
+    with open(data_file, "a", encoding="utf-8") as file:
+        file.write("1\nbad\n1\n7")
+    with caplog.at_level(logging.ERROR):
+        second, _ = compute_incremental(str(data_file), options, store)
+    full, _ = compute_statistics(str(data_file), options)
+
+    assert "'bad' at line 6" in caplog.text
+    assert second["Median"] == full["Median"]
+    assert second["Mode"] == full["Mode"] == [1.0]
+    assert math.isclose(second["Mean"], full["Mean"])
+    assert math.isclose(second["VariancePopulation"], full["VariancePopulation"])
+
+    # A rewritten file is not mistaken for an appended one
+    data_file.write_text("9\n9\n8\n8\n8\n", encoding="utf-8")
+    third, _ = compute_incremental(str(data_file), options, store)
+    assert third["Mode"] == [8.0]
+    assert third["Mean"] == 8.4
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"cno_such_module\nThing\n.",
+        b"cmath\nno_such_attr\n.",
+        b"\x80\x04trunc",
+        pickle.dumps({"offset": 3}),
+    ],
+)
+def test_incremental_run_starts_over_on_unreadable_state(tmp_path, data):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("4\n1\n4\n", encoding="utf-8")
+    options = RunOptions(workers=1)
+    store = IncrementalStore(str(data_file), tmp_path / "state")
+    compute_incremental(str(data_file), options, store)
+
+    state_file = next((tmp_path / "state").glob("*.state"))
+    state_file.write_bytes(data)
+    results, _ = compute_incremental(str(data_file), options, store)
+    assert results["Mode"] == [4.0]
+    assert results["Mean"] == 3.0
+
+
+def test_incremental_run_starts_over_on_partial_values_file(tmp_path):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("4\n1\n4\n", encoding="utf-8")
+    options = RunOptions(workers=1)
+    store = IncrementalStore(str(data_file), tmp_path / "state")
+    compute_incremental(str(data_file), options, store)
+
+    values_file = next((tmp_path / "state").glob("*.values"))
+    with open(values_file, "ab") as file:
+        file.write(b"\x00\x01")
+    assert store.load(options.cache_settings()) is None
+
+
+def test_run_case_records_phases(tmp_path):
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("1\n2\n3\n", encoding="utf-8")
+
+    output = run_case(str(data_file), RunOptions(use_cache=False))
+    assert list(output.phases.phases) == ["reduce", "compute"]
+    assert output.phases.report_lines()[0].startswith("PhaseSeconds[reduce]: ")
+
+
+def test_split_profile_args(monkeypatch):
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+    assert split_profile_args(["a.txt"]) == (None, ["a.txt"])
+    assert split_profile_args(["--profile", "a.txt"]) == ("cprofile", ["a.txt"])
+    assert split_profile_args(["--profile=all"]) == ("all", [])
+
+    monkeypatch.setenv(PROFILE_ENV, "tracemalloc")
+    assert split_profile_args(["a.txt"]) == ("tracemalloc", ["a.txt"])
+    with pytest.raises(ValueError):
+        split_profile_args(["--profile=everything"])
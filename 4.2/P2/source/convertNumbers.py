@@ -1,20 +1,153 @@
 import sys
 import time
 import logging
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
+from typing import Deque, Iterable, Iterator, Optional, Sequence, TextIO
 
-from converter_core import parse_int_strict, convert_number
+from converter_core import (
+    EXTRA_FORMATS,
+    ConversionCache,
+    ConversionResult,
+    check_formats,
+    convert_numbers,
+    parse_int_block,
+    to_decimal,
+)
+from result_writers import (
+    BASE_COLUMNS,
+    ResultWriter,
+    available_writers,
+    check_writers,
+    open_writer,
+)
+
+# Instrumentation shared with P1 and P3 lives in 4.2/shared
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
+# pylint: disable=wrong-import-position
+from cli_options import ValuedFlags, parse_flag_args, positive_int
+from instrumentation import (
+    PhaseTimer,
+    Profiler,
+    locked_append,
+    report_text,
+    split_profile_args,
+)
 
 logging.basicConfig(level=logging.INFO)
 
+USAGE = (
+    "Usage: python convertNumbers.py [--workers N] [--cache-size N] "
+    f"[--formats {','.join(EXTRA_FORMATS)}] "
+    f"[--export {','.join(available_writers())}] fileWithData.txt "
+    "[--profile[=cprofile|tracemalloc|all]]"
+)
+
+
+# Lines read, converted and written at a time: memory stays bounded by
+# one chunk whatever the input size
+CHUNK_LINES = 4096
+_WRITE_BUFFER_BYTES = 1 << 20
+# Characters read from the input at a time
+_READ_CHARS = 1 << 20
+# Line separators of str.splitlines() (text mode already turns \r and
+# \r\n into \n)
+_LINE_BREAKS = frozenset("\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+
+RESULTS_FILE = Path("../results") / "ConvertionResults.txt"
+# Chunks handed to the pool ahead of the one being written, per worker
+_CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass
+class ConvertOptions:
+    """Command line switches of convertNumbers."""
+    workers: int = 1
+    # Entries of the LRU conversion cache (per process); 0 disables it
+    cache_size: int = 0
+    # Columns added after BIN and HEX (converter_core.EXTRA_FORMATS)
+    formats: tuple[str, ...] = field(default_factory=tuple)
+    # Machine-readable copies of the rows (result_writers), one file each
+    exports: tuple[str, ...] = field(default_factory=tuple)
+
+
+def _format_list(text: str) -> tuple[str, ...]:
+    return check_formats(name.strip().lower() for name in text.split(","))
+
+
+def _export_list(text: str) -> tuple[str, ...]:
+    return check_writers(name.strip().lower() for name in text.split(","))
+
+
+_VALUED_FLAGS: ValuedFlags = {
+    "--workers": ("workers", positive_int),
+    "--cache-size": ("cache_size", positive_int),
+    "--formats": ("formats", _format_list),
+    "--export": ("exports", _export_list),
+}
+
+# Conversion cache of a pool worker process, set up by _init_worker
+_WORKER_STATE: dict[str, Optional[ConversionCache]] = {"cache": None}
+
+
+@dataclass
+class ChunkResult:
+    """Output of convert_chunk for one chunk of input lines."""
+    bodies: list[str]
+    errors: list[str]
+    timer: PhaseTimer
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+@dataclass
+class ConversionCounts:
+    """Totals of a run, reported in the results footer."""
+    valid: int = 0
+    invalid: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
 
-def _read_lines(file_path: str) -> list[str]:
-    """Read all lines from a text file."""
+def _parse_args(argv: list[str]) -> tuple[ConvertOptions, list[str]]:
+    """Split argv into options and input files; raises ValueError if invalid."""
+    options = ConvertOptions()
+    files = parse_flag_args(argv, options, _VALUED_FLAGS)
+    return options, files
+
+
+def _open_input(file_path: str) -> TextIO:
+    """Open the input file now, so a missing or unreadable file fails early."""
     path = Path(file_path)
     if not path.is_file():
         raise FileNotFoundError(f"Input file not found: {file_path}")
 
-    return path.read_text(encoding="utf-8").splitlines()
+    # pylint: disable-next=consider-using-with
+    return open(path, "r", encoding="utf-8")
+
+
+def _iter_lines(file: TextIO) -> Iterator[str]:
+    """
+    Lines of an open text file, read a chunk at a time but split exactly
+    like str.splitlines() (\x0c, \x1c, \u2028, ... also end a line).
+    Decode and read errors are raised where the chunk is read.
+    """
+    carry = ""
+    while True:
+        chunk = file.read(_READ_CHARS)
+        if not chunk:
+            break
+        lines = (carry + chunk).splitlines()
+        carry = "" if chunk[-1] in _LINE_BREAKS else lines.pop()
+        yield from lines
+    if carry:
+        yield carry
 
 
 def _extract_case_name(input_path: str) -> str:
@@ -23,83 +156,288 @@ def _extract_case_name(input_path: str) -> str:
     return name.replace(".txt", "")
 
 
-def _needs_separator(output_path: Path) -> bool:
+def _parse_numbers(lines: list[str], first_line: int) -> tuple[list[int], list[str]]:
+    """Valid integers of a chunk, plus an ERROR message per invalid line."""
+    numbers, rejects = parse_int_block(lines)
+    errors = [
+        f"ERROR line {first_line + idx}: invalid data -> {lines[idx]!r}"
+        for idx in rejects
+    ]
+    return numbers, errors
+
+
+def _format_bodies(
+    conversions: list[ConversionResult], formats: tuple[str, ...] = ()
+) -> list[str]:
+    # Row format (the ITEM number is prepended when the row is written):
+    # ITEM  <original decimal>  <binary>  <hex>  [<extra formats>...]
+    bodies = [
+        f"{to_decimal(conv.decimal)}\t{conv.binary}\t{conv.hexadecimal}"
+        for conv in conversions
+    ]
+    if formats:
+        bodies = [
+            body + "".join(f"\t{conv.extra[name]}" for name in formats)
+            for body, conv in zip(bodies, conversions)
+        ]
+    return bodies
+
+
+def convert_chunk(
+    first_line: int,
+    lines: list[str],
+    cache: Optional[ConversionCache] = None,
+    formats: tuple[str, ...] = (),
+) -> ChunkResult:
     """
-    Decide if we should add a blank line separator before appending.
-    If the file exists and has content, add a separator.
+    Parse, convert and format one chunk of input lines (a cache must hold
+    the same formats). Returns the row bodies, the ERROR messages of
+    invalid lines, the time spent in each phase and, with a cache, the
+    hits and misses of this chunk.
     """
-    if not output_path.exists():
-        return False
-    return output_path.stat().st_size > 0
+    timer = PhaseTimer()
+    with timer.span("parse"):
+        numbers, errors = _parse_numbers(lines, first_line)
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    with timer.span("compute"):
+        conversions = convert_numbers(numbers, cache, formats)
+    with timer.span("format"):
+        bodies = _format_bodies(conversions, formats)
 
+    result = ChunkResult(bodies, errors, timer)
+    if cache is not None:
+        result.cache_hits = cache.hits - hits
+        result.cache_misses = cache.misses - misses
+    return result
 
-def main() -> None:
-    if len(sys.argv) != 2:
-        print("Usage: python convertNumbers.py fileWithData.txt")
-        sys.exit(1)
 
-    input_file = sys.argv[1]
-    case_name = _extract_case_name(input_file)
+def _new_cache(options: ConvertOptions) -> Optional[ConversionCache]:
+    if not options.cache_size:
+        return None
+    return ConversionCache(options.cache_size, options.formats)
 
-    start_time = time.time()
 
-    try:
-        lines = _read_lines(input_file)
-    except (OSError, FileNotFoundError) as exc:
-        logging.error("Failed to read input file: %s", exc)
-        sys.exit(1)
+def _init_worker(options: ConvertOptions) -> None:
+    """Give each pool process its own cache, kept across its chunks."""
+    _WORKER_STATE["cache"] = _new_cache(options)
+
+
+def _convert_chunk_in_worker(
+    first_line: int, lines: list[str], formats: tuple[str, ...]
+) -> ChunkResult:
+    return convert_chunk(first_line, lines, _WORKER_STATE["cache"], formats)
 
-    results_dir = Path("../results")
-    results_dir.mkdir(exist_ok=True)
-    output_path = results_dir / "ConvertionResults.txt"
 
+def _iter_chunks(
+    lines: Iterator[str], timer: PhaseTimer
+) -> Iterator[tuple[int, list[str]]]:
+    """(first line number, lines) of each chunk of the input."""
+    line_number = 1
+    while True:
+        with timer.span("read"):
+            chunk = list(islice(lines, CHUNK_LINES))
+        if not chunk:
+            return
+        yield line_number, chunk
+        line_number += len(chunk)
+
+
+def _convert_in_pool(
+    chunks: Iterable[tuple[int, list[str]]], options: ConvertOptions
+) -> Iterator[ChunkResult]:
+    """
+    convert_chunk over a process pool, yielding results in input order.
+    Only a few chunks per worker are submitted ahead of the one being
+    consumed, so memory stays bounded like in the serial path.
+    """
+    limit = options.workers * _CHUNKS_IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(
+        max_workers=options.workers, initializer=_init_worker, initargs=(options,)
+    ) as pool:
+        pending: Deque[Future] = deque()
+        for first_line, chunk in chunks:
+            pending.append(
+                pool.submit(
+                    _convert_chunk_in_worker, first_line, chunk, options.formats
+                )
+            )
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def stream_conversions(
+    lines: Iterator[str],
+    outputs: list[TextIO],
+    timer: PhaseTimer,
+    options: Optional[ConvertOptions] = None,
+    writers: Sequence[ResultWriter] = (),
+) -> ConversionCounts:
+    """
+    Read, convert and write the input one chunk at a time, on
+    `options.workers` processes. Chunks are written in input order, so
+    ITEM numbers and the order of the ERROR lines on stderr match a serial
+    run. With a cache_size, each process converts through its own LRU
+    cache. Each chunk also goes to the export `writers`.
+    Returns the number of valid and invalid lines and the cache counters.
+    """
+    options = options or ConvertOptions()
+    chunks = _iter_chunks(lines, timer)
+    if options.workers > 1:
+        results = _convert_in_pool(chunks, options)
+    else:
+        cache = _new_cache(options)
+        results = (
+            convert_chunk(*chunk, cache, options.formats) for chunk in chunks
+        )
+
+    counts = ConversionCounts()
+    for result in results:
+        timer.add(result.timer)
+        # Req 3: show errors but continue
+        for message in result.errors:
+            print(message, file=sys.stderr)
+        counts.invalid += len(result.errors)
+        counts.cache_hits += result.cache_hits
+        counts.cache_misses += result.cache_misses
+
+        with timer.span("write"):
+            rows = "".join(
+                f"{item_index}\t{body}\n"
+                for item_index, body in enumerate(result.bodies, start=counts.valid + 1)
+            )
+            for output in outputs:
+                output.write(rows)
+            for writer in writers:
+                writer.write_rows(counts.valid + 1, result.bodies)
+        counts.valid += len(result.bodies)
+    return counts
+
+
+def _header(case_name: str, options: ConvertOptions) -> str:
     # Format similar to the reference: ITEM <TC> BIN HEX
     # Output is tab-separated for easy paste into Excel.
-    output_lines: list[str] = [f"ITEM\t{case_name}\tBIN\tHEX"]
-
-    valid_count = 0
-    error_count = 0
-
-    item_index = 0
-    for idx, line in enumerate(lines, start=1):
-        number = parse_int_strict(line)
-        if number is None:
-            error_count += 1
-            # Req 3: show errors but continue
-            print(f"ERROR line {idx}: invalid data -> {line!r}", file=sys.stderr)
-            continue
-
-        item_index += 1
-        conv = convert_number(number)
-
-        # Row format:
-        # ITEM  <original decimal>  <binary>  <hex>
-        output_lines.append(
-            f"{item_index}\t{conv.decimal}\t{conv.binary}\t{conv.hexadecimal}"
-        )
-        valid_count += 1
+    extra_columns = "".join(f"\t{name.upper()}" for name in options.formats)
+    return f"ITEM\t{case_name}\tBIN\tHEX{extra_columns}\n"
+
 
-    elapsed = time.time() - start_time
+def _cache_footer(counts: ConversionCounts, options: ConvertOptions) -> str:
+    """CacheHits/CacheMisses lines, only when the cache is enabled."""
+    if not options.cache_size:
+        return ""
+    return (
+        f"CacheHits:\t{counts.cache_hits}\n"
+        f"CacheMisses:\t{counts.cache_misses}\n"
+    )
 
-    output_lines.append("")
-    output_lines.append(f"ValidItems:\t{valid_count}")
-    output_lines.append(f"InvalidItems:\t{error_count}")
-    output_lines.append(f"ExecutionTimeSeconds:\t{elapsed}")
 
-    output_text = "\n".join(output_lines)
+def _footer(counts: ConversionCounts, options: ConvertOptions, elapsed: float) -> str:
+    return (
+        f"\nValidItems:\t{counts.valid}\n"
+        f"InvalidItems:\t{counts.invalid}\n"
+        f"{_cache_footer(counts, options)}"
+        f"ExecutionTimeSeconds:\t{elapsed}\n"
+    )
 
-    # Req 2: print on screen
-    print(output_text)
 
-    # Append to a single ConvertionResults.txt (do not overwrite)
-    with open(output_path, "a", encoding="utf-8") as file:
-        if _needs_separator(output_path):
-            file.write("\n")
+def _open_exports(
+    stack: ExitStack, case_name: str, options: ConvertOptions
+) -> list[ResultWriter]:
+    """Export writers of the case, e.g. ../results/TC1.Conversions.csv."""
+    columns = BASE_COLUMNS + options.formats
+    path_stem = RESULTS_FILE.parent / f"{case_name}.Conversions"
+    return [
+        stack.enter_context(open_writer(name, path_stem, columns))
+        for name in options.exports
+    ]
+
+
+def _write_case(
+    file: TextIO,
+    stream: TextIO,
+    options: ConvertOptions,
+    timer: PhaseTimer,
+    start_time: float,
+) -> None:
+    """
+    Rows of the input stream go to the screen (Req 2) and are appended to
+    the results file (never overwritten) as soon as each chunk is
+    converted, so nothing but the current chunk is held in memory.
+    If the case fails halfway (e.g. the input is not valid UTF-8), its
+    block is cut off the results file and its export files are removed.
+    """
+    case_name = _extract_case_name(stream.name)
+    case_start = file.tell()
+    separator = "\n" if case_start > 0 else ""
+    with ExitStack() as stack:
+        writers = _open_exports(stack, case_name, options)
+        try:
+            file.write(f"{separator}===== TEST CASE: {case_name} =====\n")
+            outputs: list[TextIO] = [sys.stdout, file]
+
+            for output in outputs:
+                output.write(_header(case_name, options))
+
+            counts = stream_conversions(
+                _iter_lines(stream), outputs, timer, options, writers
+            )
+            footer = _footer(counts, options, time.time() - start_time)
+            with timer.span("write"):
+                for output in outputs:
+                    output.write(footer)
+                sys.stdout.flush()
+        except BaseException:
+            file.truncate(case_start)
+            stack.close()
+            for writer in writers:
+                writer.path.unlink(missing_ok=True)
+            raise
+
+
+def main() -> None:
+    try:
+        profile_mode, argv = split_profile_args(sys.argv[1:])
+        options, files = _parse_args(argv)
+    except ValueError as exc:
+        print(f"{exc}\n{USAGE}")
+        sys.exit(1)
+
+    if len(files) != 1:
+        print(USAGE)
+        sys.exit(1)
+
+    input_file = files[0]
+
+    profiler = Profiler(profile_mode)
+    profiler.start()
+    timer = PhaseTimer()
+    start_time = time.time()
+
+    try:
+        stream = _open_input(input_file)
+    except (OSError, FileNotFoundError) as exc:
+        logging.error("Failed to read input file: %s", exc)
+        sys.exit(1)
+
+    # One locked append holds the case block and its report, so concurrent
+    # runs never interleave them
+    with stream, locked_append(RESULTS_FILE, _WRITE_BUFFER_BYTES) as file:
+        try:
+            _write_case(file, stream, options, timer, start_time)
+        except (OSError, UnicodeDecodeError) as exc:
+            # The case block was rolled back: the results keep no partial case
+            logging.error("Failed to convert %s: %s", input_file, exc)
+            sys.exit(1)
+        except BrokenProcessPool as exc:
+            logging.error("A conversion worker process died: %s", exc)
+            sys.exit(1)
+        profiler.stop()
 
-        file.write(f"===== TEST CASE: {case_name} =====\n")
-        file.write(output_text)
-        file.write("\n")
+        report = report_text(timer, profiler)
+        print(report)
+        file.write(f"{report}\n")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
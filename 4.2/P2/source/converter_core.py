@@ -1,10 +1,26 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 
 HEX_DIGITS = "0123456789ABCDEF"
+# Digits of every base up to 36 (HEX_DIGITS is its first 16)
+BASE_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Values above this many bits are converted by divide and conquer
+DIVIDE_CONQUER_BITS = 2048
+# Decimal strings longer than this are parsed by divide and conquer
+DIVIDE_CONQUER_DIGITS = 600
+# Pieces at most this many digits long go back to the basic loops
+_LEAF_DIGITS = 64
+
+DEFAULT_CACHE_SIZE = 4096
+
+# Two's-complement output of a value that does not fit in the width
+TWOS_COMPLEMENT_OVERFLOW = "OVERFLOW"
 
 
 @dataclass(frozen=True)
@@ -13,6 +29,8 @@ class ConversionResult:
     decimal: int
     binary: str
     hexadecimal: str
+    # Digits of each requested extra format (see EXTRA_FORMATS), by name
+    extra: Dict[str, str] = field(default_factory=dict, hash=False)
 
 
 def parse_int_strict(text: str) -> Optional[int]:
@@ -43,15 +61,80 @@ def parse_int_strict(text: str) -> Optional[int]:
         if ch < "0" or ch > "9":
             return None
 
+    if len(raw) > DIVIDE_CONQUER_DIGITS:
+        return sign * _parse_digits_split(raw)
+    return sign * _parse_digits(raw)
+
+
+def parse_int_block(lines: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    parse_int_strict over a whole block of lines, in one pass.
+
+    Returns the valid integers, in order, and the indexes (in `lines`) of
+    the rejected ones. The digit check is str.isascii() + str.isdigit(),
+    which runs in C and accepts exactly "0"-"9", so the validated token
+    can go straight to int() (which alone would also take "1_000",
+    non-ASCII digits or inner spaces). Same rules as parse_int_strict.
+    """
+    numbers: List[int] = []
+    rejects: List[int] = []
+    append = numbers.append
+    for index, line in enumerate(lines):
+        token = line.strip()
+        digits = token[1:] if token[:1] in ("+", "-") else token
+        if not (digits.isascii() and digits.isdigit()):
+            rejects.append(index)
+        elif len(digits) <= DIVIDE_CONQUER_DIGITS:
+            append(int(token))
+        else:
+            value = _parse_digits_split(digits)
+            append(-value if token[0] == "-" else value)
+    return numbers, rejects
+
+
+def _parse_digits(digits: str) -> int:
+    """Value of a string of decimal digits, one digit at a time."""
     value = 0
-    for ch in raw:
+    for ch in digits:
         digit = ord(ch) - ord("0")
         value = value * 10 + digit
+    return value
+
+
+@lru_cache(maxsize=None)
+def _power_of_ten(exponent: int) -> int:
+    """10**exponent for the (few, power-of-two) split sizes in use."""
+    if exponent == 1:
+        return 10
+    half = exponent // 2
+    return _power_of_ten(half) * _power_of_ten(exponent - half)
+
+
+def _parse_digits_split(digits: str) -> int:
+    """
+    Divide-and-conquer version of _parse_digits.
 
-    return sign * value
+    `value * 10 + digit` makes every step touch the whole (growing) value,
+    which is quadratic. Splitting the string as high * 10**k + low, with k a
+    power of two so the powers are reused, leaves a few big
+    multiplications (Karatsuba in CPython), which is subquadratic.
+    """
+    if len(digits) <= _LEAF_DIGITS:
+        return _parse_digits(digits)
+    split = 1 << ((len(digits) - 1).bit_length() - 1)
+    high = _parse_digits_split(digits[:-split])
+    low = _parse_digits_split(digits[-split:])
+    return high * _power_of_ten(split) + low
 
 
 def _convert_positive_to_base(n: int, base: int) -> str:
+    """Convert a non-negative integer to a base (no bin/hex helpers)."""
+    if n.bit_length() > DIVIDE_CONQUER_BITS:
+        return _convert_split(n, base)
+    return _convert_by_division(n, base)
+
+
+def _convert_by_division(n: int, base: int) -> str:
     """
     Convert a non-negative integer to a base using repeated division.
     This is a basic algorithm (no bin/hex helpers).
@@ -63,8 +146,8 @@ def _convert_positive_to_base(n: int, base: int) -> str:
     current = n
     while current > 0:
         remainder = current % base
-        if base == 16:
-            digits.append(HEX_DIGITS[remainder])
+        if base > 10:
+            digits.append(BASE_DIGITS[remainder])
         else:
             digits.append(str(remainder))
         current //= base
@@ -73,24 +156,260 @@ def _convert_positive_to_base(n: int, base: int) -> str:
     return "".join(reversed(digits))
 
 
-def to_binary(n: int) -> str:
-    """Convert integer to binary string using basic algorithm."""
+def _convert_split(n: int, base: int) -> str:
+    """
+    Divide-and-conquer conversion for very large integers.
+
+    Repeated division produces one digit per pass over the whole value
+    (quadratic). Instead the value is split as high * base**(2**k) + low
+    with the powers base**(2**k) computed once by squaring, and both
+    halves are converted recursively; low is zero-padded to its 2**k
+    digits. For power-of-two bases the split is a shift and a mask, which
+    is linear, so the whole conversion is O(n log n).
+    """
+    bits_per_digit = base.bit_length() - 1 if base & (base - 1) == 0 else 0
+    powers = [base]
+    while powers[-1] <= n // powers[-1]:
+        powers.append(powers[-1] * powers[-1])
+
+    def split(value: int, level: int) -> Tuple[int, int]:
+        if bits_per_digit:
+            shift = bits_per_digit << level
+            return value >> shift, value & ((1 << shift) - 1)
+        return divmod(value, powers[level])
+
+    def convert(value: int, level: int, width: int) -> str:
+        # value < base ** (2 ** (level + 1)); width 0 means "no padding"
+        if (2 << level) <= _LEAF_DIGITS or level < 0:
+            digits = _convert_by_division(value, base)
+            return digits.zfill(width) if width else digits
+
+        high, low = split(value, level)
+        if not width and high == 0:
+            return convert(low, level - 1, 0)
+        high_width = width - (1 << level) if width else 0
+        high_digits = convert(high, level - 1, high_width)
+        return high_digits + convert(low, level - 1, 1 << level)
+
+    return convert(n, len(powers) - 1, 0)
+
+
+# Lookup tables, built once with the basic algorithm above:
+# byte value -> two hex digits, and hex digit -> four binary digits.
+_BYTE_TO_HEX: Tuple[str, ...] = tuple(
+    HEX_DIGITS[byte >> 4] + HEX_DIGITS[byte & 0xF] for byte in range(256)
+)
+_HEX_TO_BINARY = str.maketrans(
+    {digit: _convert_positive_to_base(value, 2).zfill(4)
+     for value, digit in enumerate(HEX_DIGITS)}
+)
+
+
+def _bit_group_table(bits: int) -> Dict[str, str]:
+    """Group of `bits` binary digits -> one digit of base 2**bits."""
+    return {
+        _convert_positive_to_base(value, 2).zfill(bits): BASE_DIGITS[value]
+        for value in range(1 << bits)
+    }
+
+
+_OCTAL_GROUPS = _bit_group_table(3)
+_BASE32_GROUPS = _bit_group_table(5)
+_INVERT_BITS = str.maketrans("01", "10")
+
+
+def _padded_hex(n: int) -> str:
+    """
+    Hex digits of a non-negative integer, two per byte (may start with a 0).
+
+    int.to_bytes splits the value into bytes in linear time, and each byte
+    is a table lookup, instead of one Python-level division per digit.
+    """
+    data = n.to_bytes((n.bit_length() + 7) // 8 or 1, "big")
+    return "".join(map(_BYTE_TO_HEX.__getitem__, data))
+
+
+def to_decimal(n: int) -> str:
+    """
+    Decimal string of an integer. str() refuses integers of more than
+    sys.get_int_max_str_digits() digits (4300 by default), so large values
+    go through the divide-and-conquer conversion instead.
+    """
+    if n.bit_length() <= DIVIDE_CONQUER_BITS:
+        return str(n)
     if n < 0:
-        return "-" + _convert_positive_to_base(-n, 2)
-    return _convert_positive_to_base(n, 2)
+        return "-" + _convert_split(-n, 10)
+    return _convert_split(n, 10)
+
+
+def _padded_digits(n: int) -> Tuple[str, str]:
+    """
+    Zero-padded hex and binary digits of a non-negative integer, from a
+    single byte split. Every hex digit is exactly four bits, so the binary
+    string is the nibble-by-nibble expansion of the hex digits.
+    """
+    padded = _padded_hex(n)
+    return padded, padded.translate(_HEX_TO_BINARY)
+
+
+def _binary_and_hex(n: int) -> Tuple[str, str]:
+    """Binary and hexadecimal of an integer, from a single byte split."""
+    sign = "-" if n < 0 else ""
+    padded, bits = _padded_digits(-n if n < 0 else n)
+    binary = bits.lstrip("0") or "0"
+    hexadecimal = padded.lstrip("0") or "0"
+    return sign + binary, sign + hexadecimal
+
+
+def _regroup_bits(bits: str, groups: Dict[str, str], width: int) -> str:
+    """Digits of base 2**width, reading zero-padded binary `width` at a time."""
+    padded = bits.zfill(-(-len(bits) // width) * width)
+    digits = "".join(
+        [groups[padded[i:i + width]] for i in range(0, len(padded), width)]
+    )
+    return digits.lstrip("0") or "0"
+
+
+def _twos_complement(n: int, bits: str, width: int) -> str:
+    """
+    `width`-bit two's-complement binary, or OVERFLOW if n does not fit,
+    from the zero-padded binary of |n|: the same digits as n & mask, as
+    -|n| keeps the bits of |n| up to its lowest 1 and inverts the rest.
+    """
+    if not -(1 << (width - 1)) <= n < (1 << (width - 1)):
+        return TWOS_COMPLEMENT_OVERFLOW
+    bits = bits.zfill(width)[-width:]
+    if n >= 0:
+        return bits
+    lowest_one = bits.rfind("1")
+    return bits[:lowest_one].translate(_INVERT_BITS) + bits[lowest_one:]
+
+
+# Extra output formats: name -> f(n, sign, zero-padded binary of |n|).
+# The power-of-two bases regroup the binary digits already extracted for
+# BIN/HEX (two's complement included); only base 36 needs its own divisions.
+_FormatFunction = Callable[[int, str, str], str]
+_EXTRA_FORMATS: Dict[str, _FormatFunction] = {
+    "oct": lambda n, sign, bits: sign + _regroup_bits(bits, _OCTAL_GROUPS, 3),
+    "b32": lambda n, sign, bits: sign + _regroup_bits(bits, _BASE32_GROUPS, 5),
+    "b36": lambda n, sign, bits: sign + _convert_positive_to_base(abs(n), 36),
+    "tc8": lambda n, sign, bits: _twos_complement(n, bits, 8),
+    "tc16": lambda n, sign, bits: _twos_complement(n, bits, 16),
+    "tc32": lambda n, sign, bits: _twos_complement(n, bits, 32),
+    "tc64": lambda n, sign, bits: _twos_complement(n, bits, 64),
+}
+EXTRA_FORMATS: Tuple[str, ...] = tuple(_EXTRA_FORMATS)
+
+
+def check_formats(formats: Iterable[str]) -> Tuple[str, ...]:
+    """The formats as a tuple; raises ValueError for an unknown name."""
+    checked = tuple(formats)
+    for name in checked:
+        if name not in _EXTRA_FORMATS:
+            raise ValueError(
+                f"Unknown format: {name} (expected one of {', '.join(EXTRA_FORMATS)})"
+            )
+    return checked
+
+
+def to_binary(n: int) -> str:
+    """Convert integer to binary string using table-driven conversion."""
+    return _binary_and_hex(n)[0]
 
 
 def to_hexadecimal(n: int) -> str:
-    """Convert integer to hexadecimal string using basic algorithm."""
-    if n < 0:
-        return "-" + _convert_positive_to_base(-n, 16)
-    return _convert_positive_to_base(n, 16)
+    """Convert integer to hexadecimal string using table-driven conversion."""
+    return _binary_and_hex(n)[1]
 
 
-def convert_number(n: int) -> ConversionResult:
-    """Convert integer to binary and hexadecimal representations."""
+def convert_number(n: int, formats: Sequence[str] = ()) -> ConversionResult:
+    """
+    Convert integer to binary and hexadecimal representations, plus the
+    given EXTRA_FORMATS. All of them come from one byte split of n.
+    """
+    if not formats:
+        binary, hexadecimal = _binary_and_hex(n)
+        return ConversionResult(decimal=n, binary=binary, hexadecimal=hexadecimal)
+
+    sign = "-" if n < 0 else ""
+    padded, bits = _padded_digits(-n if n < 0 else n)
+    extra = {name: _EXTRA_FORMATS[name](n, sign, bits) for name in formats}
     return ConversionResult(
         decimal=n,
-        binary=to_binary(n),
-        hexadecimal=to_hexadecimal(n),
-    )
\ No newline at end of file
+        binary=sign + (bits.lstrip("0") or "0"),
+        hexadecimal=sign + (padded.lstrip("0") or "0"),
+        extra=extra,
+    )
+
+
+class ConversionCache:
+    """
+    Bounded LRU cache in front of convert_number, with hit/miss counters.
+
+    Inputs that repeat the same integers (IDs, status codes) then cost a
+    dict lookup instead of a conversion. Values above DIVIDE_CONQUER_BITS
+    are converted but never stored, so the cache memory stays bounded by
+    maxsize small entries. Every entry holds the same `formats`.
+    """
+
+    def __init__(
+        self, maxsize: int = DEFAULT_CACHE_SIZE, formats: Sequence[str] = ()
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.formats = check_formats(formats)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, ConversionResult] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def convert(self, n: int) -> ConversionResult:
+        entries = self._entries
+        result = entries.get(n)
+        if result is not None:
+            self.hits += 1
+            entries.move_to_end(n)
+            return result
+
+        self.misses += 1
+        result = convert_number(n, self.formats)
+        if n.bit_length() <= DIVIDE_CONQUER_BITS:
+            entries[n] = result
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return result
+
+    def to_binary(self, n: int) -> str:
+        return self.convert(n).binary
+
+    def to_hexadecimal(self, n: int) -> str:
+        return self.convert(n).hexadecimal
+
+
+def convert_numbers(
+    numbers: Iterable[int],
+    cache: Optional[ConversionCache] = None,
+    formats: Sequence[str] = (),
+) -> List[ConversionResult]:
+    """
+    Convert a whole batch of integers, in order.
+
+    Each value is split into bytes once and both representations come
+    from that split; binary and hex are never computed separately.
+    With a cache, repeated values are looked up instead (and the cache's
+    own formats apply).
+    """
+    if cache is not None:
+        return [cache.convert(n) for n in numbers]
+    if formats:
+        return [convert_number(n, formats) for n in numbers]
+
+    results: List[ConversionResult] = []
+    append = results.append
+    for n in numbers:
+        binary, hexadecimal = _binary_and_hex(n)
+        append(ConversionResult(decimal=n, binary=binary, hexadecimal=hexadecimal))
+    return results
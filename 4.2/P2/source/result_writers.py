@@ -0,0 +1,164 @@
+"""
+Machine-readable copies of the conversion rows (CSV, JSON Lines, Parquet).
+
+ConvertionResults.txt is the human evidence; these files are for
+downstream jobs, so they can load the conversions without re-parsing the
+tab-separated text. Rows are written as each chunk is converted, so memory
+stays bounded by one chunk like the text output.
+"""
+import csv
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Type
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; CSV and JSON Lines always work
+    pa = None
+    pq = None
+
+BASE_COLUMNS = ("item", "decimal", "binary", "hexadecimal")
+
+
+class ResultWriter(ABC):
+    """
+    One row per valid item. `columns` are BASE_COLUMNS plus the extra
+    formats, in the order of the tab-separated row bodies.
+    """
+
+    extension = ""
+
+    def __init__(self, path: Path, columns: Sequence[str]) -> None:
+        self.path = path
+        self.columns = list(columns)
+
+    @abstractmethod
+    def write_rows(self, first_item: int, bodies: Sequence[str]) -> None:
+        """Write the rows of one chunk; the first has ITEM number first_item."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and close the output file."""
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class CsvResultWriter(ResultWriter):
+    """Comma-separated values with a header row."""
+
+    extension = "csv"
+
+    def __init__(self, path: Path, columns: Sequence[str]) -> None:
+        super().__init__(path, columns)
+        # pylint: disable-next=consider-using-with
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write_rows(self, first_item: int, bodies: Sequence[str]) -> None:
+        self._writer.writerows(
+            [item, *body.split("\t")]
+            for item, body in enumerate(bodies, start=first_item)
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonLinesResultWriter(ResultWriter):
+    """
+    One JSON object per line. The item is a number and every other column,
+    the decimal value included, is a string: values are not bounded to 64
+    bits and json.loads refuses integers past the int/str digit limit, so
+    the decimal keeps one type on every row (like the Parquet column).
+    """
+
+    extension = "jsonl"
+
+    def __init__(self, path: Path, columns: Sequence[str]) -> None:
+        super().__init__(path, columns)
+        # pylint: disable-next=consider-using-with
+        self._file = open(path, "w", encoding="utf-8")
+        # Digits, letters, "-" and "OVERFLOW" only: nothing to escape
+        keys = [f'"{name}": ' for name in self.columns]
+        self._template = (
+            "{{" + keys[0] + "{}, "
+            + ", ".join(key + '"{}"' for key in keys[1:]) + "}}\n"
+        )
+
+    def write_rows(self, first_item: int, bodies: Sequence[str]) -> None:
+        template = self._template
+        self._file.write(
+            "".join(
+                template.format(item, *body.split("\t"))
+                for item, body in enumerate(bodies, start=first_item)
+            )
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetResultWriter(ResultWriter):
+    """
+    Columnar Parquet file (needs pyarrow), one row group per chunk. The
+    decimal column is a string, since values are not bounded to 64 bits.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, path: Path, columns: Sequence[str]) -> None:
+        super().__init__(path, columns)
+        self._schema = pa.schema(
+            [(self.columns[0], pa.int64())]
+            + [(name, pa.string()) for name in self.columns[1:]]
+        )
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+
+    def write_rows(self, first_item: int, bodies: Sequence[str]) -> None:
+        if not bodies:
+            return
+        fields = list(zip(*(body.split("\t") for body in bodies)))
+        items = list(range(first_item, first_item + len(bodies)))
+        arrays = [pa.array(items, pa.int64())]
+        arrays += [pa.array(values, pa.string()) for values in fields]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_WRITERS: Dict[str, Type[ResultWriter]] = {
+    "csv": CsvResultWriter,
+    "jsonl": JsonLinesResultWriter,
+}
+if pa is not None:
+    _WRITERS["parquet"] = ParquetResultWriter
+
+
+def available_writers() -> List[str]:
+    return list(_WRITERS)
+
+
+def check_writers(names: Iterable[str]) -> Tuple[str, ...]:
+    """The writer names as a tuple; raises ValueError if one is not available."""
+    checked = tuple(names)
+    for name in checked:
+        if name not in _WRITERS:
+            raise ValueError(
+                f"Export format not available: {name} "
+                f"(expected one of {', '.join(available_writers())})"
+            )
+    return checked
+
+
+def open_writer(name: str, path_stem: Path, columns: Sequence[str]) -> ResultWriter:
+    """Writer by name ("csv", "jsonl" or "parquet") for path_stem.<extension>."""
+    writer_class = _WRITERS[check_writers((name,))[0]]
+    path = path_stem.with_name(f"{path_stem.name}.{writer_class.extension}")
+    return writer_class(path, columns)
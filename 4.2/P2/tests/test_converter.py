@@ -1,9 +1,28 @@
+import io
+import os
+import csv
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+import convertNumbers
+from convertNumbers import ConvertOptions, _iter_lines
 from converter_core import (
+    DIVIDE_CONQUER_BITS,
+    EXTRA_FORMATS,
+    ConversionCache,
+    parse_int_block,
     parse_int_strict,
     to_binary,
     to_hexadecimal,
     convert_number,
+    convert_numbers,
+    to_decimal,
 )
+from instrumentation import PhaseTimer
+from result_writers import BASE_COLUMNS, open_writer
 
 
 def test_parse_int_strict_valid() -> None:
@@ -23,6 +42,19 @@ def test_parse_int_strict_invalid() -> None:
     assert parse_int_strict("--1") is None
 
 
+def test_parse_int_block_matches_strict_parser() -> None:
+    lines = [
+        "10", "  -7 ", "+0", "-0", "\t42\n", "", "   ", "+", "-", "+-1", "--1",
+        "12.5", "1e3", "1_000", "0x1F", "1 2", "\u0663", "\u00b2", "\uff11",
+        "\u00a05\u2003", "007", "9" * 5000, "-" + "1" * 700,
+    ]
+    numbers, rejects = parse_int_block(lines)
+
+    expected = [parse_int_strict(line) for line in lines]
+    assert numbers == [number for number in expected if number is not None]
+    assert rejects == [idx for idx, number in enumerate(expected) if number is None]
+
+
 def test_to_binary_basic() -> None:
     assert to_binary(0) == "0"
     assert to_binary(1) == "1"
@@ -44,4 +76,249 @@ def test_convert_number() -> None:
     conv = convert_number(31)
     assert conv.decimal == 31
     assert conv.binary == "11111"
-    assert conv.hexadecimal == "1F"
\ No newline at end of file
+    assert conv.hexadecimal == "1F"
+
+
+def test_table_conversion_matches_builtin_formatting() -> None:
+    rng = random.Random(7)
+    samples = [0, 1, -1, 15, 16, 255, 256, -4096, 2**64, -(2**64) + 1]
+    samples += [rng.randint(-(2**bits), 2**bits) for bits in range(1, 3000, 37)]
+    for n in samples:
+        assert to_binary(n) == format(n, "b")
+        assert to_hexadecimal(n) == format(n, "X")
+
+
+def test_convert_numbers_batch_matches_single() -> None:
+    numbers = [31, -31, 0, 2**100 + 5, 7]
+    assert convert_numbers(numbers) == [convert_number(n) for n in numbers]
+    assert not convert_numbers([])
+
+
+def test_divide_and_conquer_conversion_of_huge_values() -> None:
+    rng = random.Random(11)
+    for bits in (2049, 5000, 40000):
+        n = rng.getrandbits(bits) | (1 << (bits - 1))
+        assert to_binary(n) == format(n, "b")
+        assert to_hexadecimal(-n) == format(-n, "X")
+        # Round trip through the decimal parser and printer, beyond the
+        # 4300-digit limit of int()/str()
+        huge = n**4
+        assert parse_int_strict(to_decimal(huge)) == huge
+        assert parse_int_strict("-" + to_decimal(huge)) == -huge
+
+    # Zero padding of the low halves
+    assert to_decimal(10**5000).count("0") == 5000
+    assert to_binary(1 << 30000) == "1" + "0" * 30000
+
+
+def test_stream_conversions_numbers_items_across_chunks(
+    monkeypatch, capsys
+) -> None:
+    monkeypatch.setattr(convertNumbers, "CHUNK_LINES", 2)
+    lines = iter(["5", "x", "-2", "", "16", "7"])
+    output = io.StringIO()
+
+    counts = convertNumbers.stream_conversions(lines, [output], PhaseTimer())
+
+    assert (counts.valid, counts.invalid) == (4, 2)
+    assert output.getvalue() == (
+        "1\t5\t101\t5\n2\t-2\t-10\t-2\n3\t16\t10000\t10\n4\t7\t111\t7\n"
+    )
+    errors = capsys.readouterr().err.splitlines()
+    assert errors == [
+        "ERROR line 2: invalid data -> 'x'",
+        "ERROR line 4: invalid data -> ''",
+    ]
+
+
+def test_iter_lines_splits_like_splitlines(monkeypatch) -> None:
+    monkeypatch.setattr(convertNumbers, "_READ_CHARS", 3)
+    text = "1\x0c2\n\n33\u20284\x1c\n55555\n6"
+    lines = list(_iter_lines(io.StringIO(text)))
+    assert lines == text.splitlines() == ["1", "2", "", "33", "4", "", "55555", "6"]
+
+
+def test_invalid_utf8_rolls_back_the_case(tmp_path, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(convertNumbers, "CHUNK_LINES", 100)
+    monkeypatch.setattr(convertNumbers, "_READ_CHARS", 1000)
+    results = tmp_path / "results" / "ConvertionResults.txt"
+    monkeypatch.setattr(convertNumbers, "RESULTS_FILE", results)
+    results.parent.mkdir()
+    results.write_text("earlier case\n", encoding="utf-8")
+    data_file = tmp_path / "TC9.txt"
+    # Far past the first decoded block, so rows were written before the error
+    data_file.write_bytes(b"1\n" * 20000 + b"\xff\n")
+
+    monkeypatch.setattr(
+        "sys.argv", ["convertNumbers.py", "--export", "csv", str(data_file)]
+    )
+    with pytest.raises(SystemExit) as excinfo:
+        convertNumbers.main()
+    capsys.readouterr()
+
+    assert excinfo.value.code == 1
+    assert results.read_text(encoding="utf-8") == "earlier case\n"
+    assert not (results.parent / "TC9.Conversions.csv").exists()
+
+
+def _kill_worker(*_args):
+    os._exit(1)
+
+
+def test_dead_worker_rolls_back_the_case(tmp_path, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(convertNumbers, "_convert_chunk_in_worker", _kill_worker)
+    results = tmp_path / "results" / "ConvertionResults.txt"
+    monkeypatch.setattr(convertNumbers, "RESULTS_FILE", results)
+    data_file = tmp_path / "TC9.txt"
+    data_file.write_text("1\n2\n3\n", encoding="utf-8")
+
+    monkeypatch.setattr(
+        "sys.argv", ["convertNumbers.py", "--workers", "2", str(data_file)]
+    )
+    with pytest.raises(SystemExit) as excinfo:
+        convertNumbers.main()
+    capsys.readouterr()
+
+    assert excinfo.value.code == 1
+    assert results.read_text(encoding="utf-8") == ""
+
+
+def test_stream_conversions_pool_matches_serial(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(convertNumbers, "CHUNK_LINES", 3)
+    rng = random.Random(5)
+    lines = [str(rng.randint(-(2**70), 2**70)) for _ in range(40)]
+    lines[4] = "1.5"
+    lines[31] = "abc"
+
+    outputs = {}
+    for workers in (1, 3):
+        output = io.StringIO()
+        counts = convertNumbers.stream_conversions(
+            iter(lines), [output], PhaseTimer(), ConvertOptions(workers=workers)
+        )
+        outputs[workers] = (counts, output.getvalue(), capsys.readouterr().err)
+
+    assert outputs[3] == outputs[1]
+    assert (outputs[1][0].valid, outputs[1][0].invalid) == (38, 2)
+
+
+def test_conversion_cache_counts_and_evicts_least_recent() -> None:
+    cache = ConversionCache(maxsize=2)
+    assert cache.convert(10) == convert_number(10)
+    assert cache.to_binary(10) == "1010"
+    cache.convert(-3)
+    cache.convert(10)
+    cache.convert(7)  # evicts -3, the least recently used
+    assert len(cache) == 2
+    assert cache.to_hexadecimal(-3) == "-3"
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    huge = 1 << (DIVIDE_CONQUER_BITS + 1)
+    assert cache.to_binary(huge) == to_binary(huge)
+    assert len(cache) == 2  # huge values are not stored
+
+
+def test_stream_conversions_cache_counters(capsys) -> None:
+    lines = ["4", "4", "x", "9", "4", "9"]
+    plain, cached = io.StringIO(), io.StringIO()
+
+    convertNumbers.stream_conversions(iter(lines), [plain], PhaseTimer())
+    counts = convertNumbers.stream_conversions(
+        iter(lines), [cached], PhaseTimer(), ConvertOptions(cache_size=8)
+    )
+    capsys.readouterr()
+
+    assert cached.getvalue() == plain.getvalue()
+    assert (counts.valid, counts.invalid) == (5, 1)
+    assert (counts.cache_hits, counts.cache_misses) == (3, 2)
+
+
+def test_extra_formats_match_builtin_formatting() -> None:
+    rng = random.Random(11)
+    values = [0, 1, -1, 127, -128, 128, 2**63 - 1, -(2**63), 2**64, 7**3000]
+    values += [rng.randint(-(2**80), 2**80) for _ in range(200)]
+    # Negative values that fit each two's-complement width
+    values += [-(2**width) + rng.randint(0, 2**width - 1) for width in (7, 15, 31, 63)]
+    values += [rng.randint(-300, 300) for _ in range(50)]
+    for n in values:
+        result = convert_number(n, EXTRA_FORMATS)
+        assert (result.binary, result.hexadecimal) == (to_binary(n), to_hexadecimal(n))
+        assert result.extra["oct"] == ("-" if n < 0 else "") + format(abs(n), "o")
+        assert int(result.extra["b32"], 32) == n
+        assert int(result.extra["b36"], 36) == n
+        for width in (8, 16, 32, 64):
+            expected = "OVERFLOW"
+            if -(1 << (width - 1)) <= n < 1 << (width - 1):
+                expected = format(n & ((1 << width) - 1), f"0{width}b")
+            assert result.extra[f"tc{width}"] == expected
+
+
+def test_stream_conversions_extra_columns(capsys) -> None:
+    options = ConvertOptions(cache_size=4, formats=("oct", "tc8"))
+    output = io.StringIO()
+
+    convertNumbers.stream_conversions(
+        iter(["8", "-1", "300", "8"]), [output], PhaseTimer(), options
+    )
+    capsys.readouterr()
+
+    assert output.getvalue() == (
+        "1\t8\t1000\t8\t10\t00001000\n"
+        "2\t-1\t-1\t-1\t-1\t11111111\n"
+        "3\t300\t100101100\t12C\t454\tOVERFLOW\n"
+        "4\t8\t1000\t8\t10\t00001000\n"
+    )
+
+
+def _export_rows(tmp_path, name: str, monkeypatch) -> Path:
+    monkeypatch.setattr(convertNumbers, "CHUNK_LINES", 2)
+    columns = BASE_COLUMNS + ("tc8",)
+    options = ConvertOptions(formats=("tc8",))
+    with open_writer(name, tmp_path / "TC", columns) as writer:
+        convertNumbers.stream_conversions(
+            iter(["5", "bad", "-2", "7"]), [io.StringIO()], PhaseTimer(), options,
+            [writer],
+        )
+    return writer.path
+
+
+def test_csv_and_jsonl_exports(tmp_path, monkeypatch, capsys) -> None:
+    csv_path = _export_rows(tmp_path, "csv", monkeypatch)
+    jsonl_path = _export_rows(tmp_path, "jsonl", monkeypatch)
+    capsys.readouterr()
+
+    with open(csv_path, encoding="utf-8", newline="") as file:
+        assert list(csv.reader(file)) == [
+            ["item", "decimal", "binary", "hexadecimal", "tc8"],
+            ["1", "5", "101", "5", "00000101"],
+            ["2", "-2", "-10", "-2", "11111110"],
+            ["3", "7", "111", "7", "00000111"],
+        ]
+    with open(jsonl_path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert records[1] == {
+        "item": 2, "decimal": "-2", "binary": "-10", "hexadecimal": "-2",
+        "tc8": "11111110",
+    }
+    assert [record["item"] for record in records] == [1, 2, 3]
+
+
+def test_jsonl_export_writes_every_decimal_as_a_string(tmp_path) -> None:
+    huge = "9" * 5000
+    with open_writer("jsonl", tmp_path / "TC", BASE_COLUMNS) as writer:
+        writer.write_rows(1, ["-12\t-1100\t-C", f"{huge}\t1\t1"])
+
+    with open(writer.path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["decimal"] for record in records] == ["-12", huge]
+
+
+def test_parquet_export(tmp_path, monkeypatch, capsys) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = _export_rows(tmp_path, "parquet", monkeypatch)
+    capsys.readouterr()
+
+    table = pq.read_table(path).to_pydict()
+    assert table["item"] == [1, 2, 3]
+    assert table["decimal"] == ["5", "-2", "7"]
+    assert table["tc8"] == ["00000101", "11111110", "00000111"]
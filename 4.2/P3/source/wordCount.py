@@ -1,20 +1,97 @@
 import sys
 import time
 import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from pathlib import Path
 
-from wordcount_core import tokenize, count_words, sort_counts
+from wordcount_core import (
+    WordCountResult,
+    count_words_in_file,
+    count_words_in_range,
+    shard_offsets,
+    sort_counts,
+)
+
+# Instrumentation shared with P1 and P2 lives in 4.2/shared
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
+# pylint: disable=wrong-import-position
+from cli_options import ValuedFlags, parse_flag_args, positive_int
+from instrumentation import (
+    PhaseTimer,
+    Profiler,
+    locked_append,
+    report_text,
+    split_profile_args,
+)
 
 logging.basicConfig(level=logging.INFO)
 
+USAGE = (
+    "Usage: python wordCount.py [--workers N] fileWithData.txt "
+    "[--profile[=cprofile|tracemalloc|all]]"
+)
 
-def _read_text(file_path: str) -> str:
-    """Read all text content from a file."""
+RESULTS_FILE = Path("../results") / "WordCountResults.txt"
+
+# Shards per worker (smaller shards balance the load better), and the
+# smallest shard worth sending to another process
+_SHARDS_PER_WORKER = 4
+MIN_SHARD_BYTES = 1 << 20
+
+
+@dataclass
+class WordCountOptions:
+    """Command line switches of wordCount."""
+    workers: int = 1
+
+
+_VALUED_FLAGS: ValuedFlags = {
+    "--workers": ("workers", positive_int),
+}
+
+
+def _parse_args(argv: list[str]) -> tuple[WordCountOptions, list[str]]:
+    """Split argv into options and input files; raises ValueError if invalid."""
+    options = WordCountOptions()
+    files = parse_flag_args(argv, options, _VALUED_FLAGS)
+    return options, files
+
+
+def count_parallel(file_path: str, workers: int) -> Counter[str]:
+    """
+    Map-reduce count: the file is split at whitespace-safe byte offsets,
+    each shard is counted in a worker process and the per-shard counters
+    are summed. Counts are the same as count_words_in_file.
+    """
+    size = Path(file_path).stat().st_size
+    shards = min(workers * _SHARDS_PER_WORKER, size // MIN_SHARD_BYTES)
+    if workers == 1 or shards < 2:
+        return count_words_in_file(file_path)
+
+    ranges = shard_offsets(file_path, shards)
+    counts: Counter[str] = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard_counts in pool.map(
+            count_words_in_range,
+            [file_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+        ):
+            counts.update(shard_counts)
+    return counts
+
+
+def _count_file(file_path: str, workers: int) -> Counter[str]:
+    """Word counts of a file, streamed in chunks (never read whole)."""
     path = Path(file_path)
     if not path.is_file():
         raise FileNotFoundError(f"Input file not found: {file_path}")
 
-    return path.read_text(encoding="utf-8", errors="replace")
+    return count_parallel(file_path, workers)
 
 
 def _extract_case_name(input_path: str) -> str:
@@ -25,62 +102,96 @@ def _extract_case_name(input_path: str) -> str:
     return name
 
 
+def _format_output(
+    case_name: str,
+    sorted_results: list[WordCountResult],
+    total_words: int,
+    elapsed: float,
+) -> str:
+    # Output (tab-separated)
+    output_lines: list[str] = []
+    output_lines.append(f"===== TEST CASE: {case_name} =====")
+    output_lines.append("WORD\tFREQUENCY")
+    for item in sorted_results:
+        output_lines.append(f"{item.word}\t{item.count}")
+
+    output_lines.append("")
+    output_lines.append(f"DistinctWords:\t{len(sorted_results)}")
+    output_lines.append(f"TotalWords:\t{total_words}")
+    output_lines.append(f"ExecutionTimeSeconds:\t{elapsed}")
+
+    return "\n".join(output_lines)
+
+
+def _write_output(
+    output_path: Path, output_text: str, timer: PhaseTimer, profiler: Profiler
+) -> None:
+    """
+    Append the case and its phase report (printed too) to the evidence
+    file in one locked write, so concurrent runs never interleave them.
+    """
+    report = report_text(timer, profiler)
+    print(report)
+
+    # Append so multiple TCs do not overwrite evidence
+    with locked_append(output_path) as file:
+        if file.tell() > 0:
+            file.write("\n\n")
+        file.write(f"{output_text}\n{report}\n")
+
+
 def main() -> None:
-    if len(sys.argv) != 2:
-        print("Usage: python wordCount.py fileWithData.txt")
+    try:
+        profile_mode, argv = split_profile_args(sys.argv[1:])
+        options, files = _parse_args(argv)
+    except ValueError as exc:
+        print(f"{exc}\n{USAGE}")
         sys.exit(1)
 
-    input_file = sys.argv[1]
+    if len(files) != 1:
+        print(USAGE)
+        sys.exit(1)
+
+    input_file = files[0]
     case_name = _extract_case_name(input_file)
 
+    profiler = Profiler(profile_mode)
+    profiler.start()
+    timer = PhaseTimer()
     start_time = time.time()
 
     try:
-        content = _read_text(input_file)
+        # Reading, tokenizing and counting are fused into one pass
+        with timer.span("count"):
+            counts = _count_file(input_file, options.workers)
     except (OSError, FileNotFoundError) as exc:
         logging.error("Failed to read input file: %s", exc)
         sys.exit(1)
+    except BrokenProcessPool as exc:
+        logging.error("A word count worker process died: %s", exc)
+        sys.exit(1)
 
-    tokens = tokenize(content)
-
-    if not tokens:
+    total_words = sum(counts.values())
+    if not total_words:
         # Req 3: show error but continue execution
         print("ERROR: No valid words found in input.", file=sys.stderr)
 
-    counts = count_words(tokens)
-    sorted_results = sort_counts(counts)
+    with timer.span("compute"):
+        sorted_results = sort_counts(counts)
 
     elapsed = time.time() - start_time
 
-    # Output (tab-separated)
-    output_lines: list[str] = []
-    output_lines.append(f"===== TEST CASE: {case_name} =====")
-    output_lines.append("WORD\tFREQUENCY")
-    for item in sorted_results:
-        output_lines.append(f"{item.word}\t{item.count}")
-
-    output_lines.append("")
-    output_lines.append(f"DistinctWords:\t{len(sorted_results)}")
-    output_lines.append(f"TotalWords:\t{len(tokens)}")
-    output_lines.append(f"ExecutionTimeSeconds:\t{elapsed}")
-
-    output_text = "\n".join(output_lines)
+    with timer.span("format"):
+        output_text = _format_output(case_name, sorted_results, total_words, elapsed)
 
-    # Req 2: print on screen
-    print(output_text)
+    with timer.span("write"):
+        # Req 2: print on screen
+        print(output_text)
+    profiler.stop()
 
-    # Write evidence file in required location
-    results_dir = Path("../results")
-    results_dir.mkdir(exist_ok=True)
-    output_path = results_dir / "WordCountResults.txt"
-
-    # Append so multiple TCs do not overwrite evidence
-    with open(output_path, "a", encoding="utf-8") as file:
-        if output_path.exists() and output_path.stat().st_size > 0:
-            file.write("\n\n")
-        file.write(output_text)
-        file.write("\n")
+    # The append to the evidence file is not timed
+    _write_output(RESULTS_FILE, output_text, timer, profiler)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
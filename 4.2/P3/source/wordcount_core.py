@@ -1,7 +1,31 @@
 from __future__ import annotations
 
+import os
+import re
+import codecs
+from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Runs of characters for which str.isalnum() is true: re's Unicode \w is
+# isalnum() plus "_", so removing "_" leaves exactly _is_word_char
+_WORD_RE = re.compile(r"[^\W_]+")
+# str.lower() maps capital sigma by context (final form at a word end),
+# unlike the per-character lower() of tokenize_basic
+_CONTEXT_LOWER = "\u03a3"
+
+# Everything up to the last non-word character. Anchored with match(),
+# ".*" runs to the end once and backtracks only over the trailing word,
+# so finding the cut is linear in the chunk size
+_LAST_SEPARATOR_RE = re.compile(r".*[\W_]", re.DOTALL)
+
+# Characters read from the file at a time by count_words_in_file
+DEFAULT_CHUNK_CHARS = 1 << 20
+# Bytes read at a time from a shard by count_words_in_range
+DEFAULT_CHUNK_BYTES = 1 << 20
+# ASCII whitespace never occurs inside a UTF-8 multi-byte sequence and is
+# never part of a word, so a shard may start right after any of these
+_SPLIT_RE = re.compile(rb"[ \t\n\r\x0b\x0c]")
 
 
 @dataclass(frozen=True)
@@ -25,8 +49,32 @@ def _is_word_char(ch: str) -> bool:
 
 
 def tokenize(text: str) -> List[str]:
+    """
+    Tokenize input text into lowercase words; same tokens as
+    tokenize_basic, without Python-level work per character.
+
+    Tokens are found with one compiled regex over the text. ASCII text is
+    lowercased once up front; otherwise each token is lowercased after
+    splitting, since lower() can turn a letter into a non-alnum sequence
+    (e.g. U+0130 -> "i" + combining dot) that would move the token
+    boundaries.
+    """
+    if text.isascii():
+        return _WORD_RE.findall(text.lower())
+
+    tokens = _WORD_RE.findall(text)
+    for index, token in enumerate(tokens):
+        if _CONTEXT_LOWER in token:
+            tokens[index] = "".join([ch.lower() for ch in token])
+        else:
+            tokens[index] = token.lower()
+    return tokens
+
+
+def tokenize_basic(text: str) -> List[str]:
     """
     Tokenize input text into words using basic algorithms (no regex).
+    Reference implementation for tokenize.
 
     - Lowercases tokens for case-insensitive counting.
     - Splits using any non-alphanumeric as separator.
@@ -65,6 +113,110 @@ def count_words(tokens: List[str]) -> Dict[str, int]:
     return counts
 
 
+def count_words_stream(chunks: Iterable[str]) -> Counter[str]:
+    """
+    Count the words of a text given as consecutive chunks, tokenizing
+    and counting each chunk as it comes (same counts as
+    count_words(tokenize(text))).
+
+    A word may continue in the next chunk, so the run of word characters
+    after the last separator of a chunk is held back. The held-back parts
+    are kept in a list and joined only once a separator arrives, so a
+    word spanning many chunks is not re-copied or re-scanned for each of
+    them. Only one chunk's tokens exist at a time: memory follows the
+    vocabulary, not the corpus.
+    """
+    counts: Counter[str] = Counter()
+    carry: List[str] = []
+    for chunk in chunks:
+        match = _LAST_SEPARATOR_RE.match(chunk)
+        if match is None:
+            # No separator: the held-back word goes on in the next chunk
+            carry.append(chunk)
+            continue
+        cut = match.end()
+        head = chunk[:cut]
+        if carry:
+            carry.append(head)
+            head = "".join(carry)
+        counts.update(tokenize(head))
+        carry = [chunk[cut:]]
+    counts.update(tokenize("".join(carry)))
+    return counts
+
+
+def _iter_file_chunks(path: str, chunk_chars: int) -> Iterator[str]:
+    # Text mode: the decoder keeps multi-byte characters and \r\n pairs
+    # whole across reads, like reading the whole file at once
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        while True:
+            chunk = file.read(chunk_chars)
+            if not chunk:
+                return
+            yield chunk
+
+
+def count_words_in_file(
+    path: str, chunk_chars: int = DEFAULT_CHUNK_CHARS
+) -> Counter[str]:
+    """Word counts of a UTF-8 file, read and counted chunk by chunk."""
+    return count_words_stream(_iter_file_chunks(path, chunk_chars))
+
+
+def _next_split(file, offset: int, size: int) -> int:
+    """First offset >= offset right after an ASCII whitespace byte (or size)."""
+    file.seek(offset)
+    while offset < size:
+        block = file.read(DEFAULT_CHUNK_BYTES)
+        match = _SPLIT_RE.search(block)
+        if match:
+            return offset + match.end()
+        offset += len(block)
+    return size
+
+
+def shard_offsets(path: str, shards: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into up to `shards` (start, end) byte ranges of about
+    the same size, each boundary moved forward to just after an ASCII
+    whitespace byte, so no word or UTF-8 character spans two ranges.
+    """
+    size = os.path.getsize(path)
+    ranges: List[Tuple[int, int]] = []
+    start = 0
+    with open(path, "rb") as file:
+        for index in range(1, shards):
+            if start >= size:
+                break
+            end = _next_split(file, max(start, size * index // shards), size)
+            ranges.append((start, end))
+            start = end
+    if start < size or not ranges:
+        ranges.append((start, size))
+    return ranges
+
+
+def _iter_range_chunks(path: str, start: int, end: int) -> Iterator[str]:
+    # Incremental decoding keeps characters cut by a read whole, and
+    # replaces invalid bytes like the text-mode reads of the serial path
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = file.read(min(DEFAULT_CHUNK_BYTES, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+
+def count_words_in_range(path: str, start: int, end: int) -> Counter[str]:
+    """Word counts of the bytes [start, end) of a file (a shard_offsets range)."""
+    return count_words_stream(_iter_range_chunks(path, start, end))
+
+
 def sort_counts(counts: Dict[str, int]) -> List[WordCountResult]:
     """
     Convert counts dict to a sorted list.
@@ -83,4 +235,4 @@ def sort_counts(counts: Dict[str, int]) -> List[WordCountResult]:
     for word, cnt in items:
         results.append(WordCountResult(word=word, count=cnt))
 
-    return results
\ No newline at end of file
+    return results
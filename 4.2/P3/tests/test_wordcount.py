@@ -1,4 +1,21 @@
-from wordcount_core import tokenize, count_words, sort_counts
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import wordCount
+from wordcount_core import (
+    tokenize,
+    tokenize_basic,
+    count_words,
+    count_words_in_file,
+    count_words_in_range,
+    count_words_stream,
+    shard_offsets,
+    sort_counts,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 
 
 def test_tokenize_basic() -> None:
@@ -7,6 +24,20 @@ def test_tokenize_basic() -> None:
     assert tokens == ["hello", "hello", "world", "world"]
 
 
+@pytest.mark.parametrize("case", ["TC1", "TC2", "TC3", "TC4", "TC5"])
+def test_tokenize_matches_basic_on_test_cases(case: str) -> None:
+    text = (DATA_DIR / f"{case}.txt").read_text(encoding="utf-8", errors="replace")
+    assert tokenize(text) == tokenize_basic(text)
+
+
+def test_tokenize_matches_basic_on_unicode() -> None:
+    # Final sigma, dotted capital I (lowercases to 2 chars), "_" and
+    # non-ASCII digits/separators
+    text = "ΟΔΟΣ ΣΑΣ odoΣ\u0130stanbul \u0130 snake_case \u0663\u0664 a\u00a0b \ufffd"
+    assert tokenize(text) == tokenize_basic(text)
+    assert tokenize("ΟΔΟΣ") == ["οδοσ"]
+
+
 def test_count_words_basic() -> None:
     tokens = ["a", "b", "a", "c", "b", "a"]
     counts = count_words(tokens)
@@ -15,6 +46,60 @@ def test_count_words_basic() -> None:
     assert counts["c"] == 1
 
 
+@pytest.mark.parametrize("chunk_chars", [1, 2, 7, 4096])
+def test_count_words_stream_matches_whole_text(chunk_chars: int) -> None:
+    text = (DATA_DIR / "TC3.txt").read_text(encoding="utf-8", errors="replace")
+    text += " ΟΔΟΣ tail"
+    chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+    assert count_words_stream(chunks) == count_words(tokenize(text))
+
+
+def test_count_words_stream_word_spanning_many_chunks() -> None:
+    long_word = "Ab" * 5000
+    chunks = ["x "] + [long_word[i:i + 3] for i in range(0, len(long_word), 3)]
+    chunks += [" y_", "", "z"]
+    assert count_words_stream(chunks) == {"x": 1, long_word.lower(): 1, "y": 1, "z": 1}
+
+
+def test_count_words_in_file_across_chunk_boundaries(tmp_path) -> None:
+    path = tmp_path / "words.txt"
+    # \xff is invalid UTF-8: replaced by U+FFFD, a separator
+    path.write_bytes("Año\r\naño  Über-über\r\n".encode("utf-8") + b"\xffend\xff")
+    text = path.read_text(encoding="utf-8", errors="replace")
+
+    for chunk_chars in (1, 3, 1000):
+        counts = count_words_in_file(str(path), chunk_chars)
+        assert counts == count_words(tokenize(text))
+    assert counts == {"año": 2, "über": 2, "end": 1}
+
+
+def test_shards_split_after_whitespace_and_sum_to_serial_counts(tmp_path) -> None:
+    path = tmp_path / "words.txt"
+    data = (DATA_DIR / "TC5.txt").read_bytes() + "  ΟΔΟΣ Ñandú\n".encode("utf-8") * 50
+    path.write_bytes(data)
+
+    ranges = shard_offsets(str(path), 7)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end].isspace()
+
+    merged: Counter[str] = Counter()
+    for start, end in ranges:
+        merged.update(count_words_in_range(str(path), start, end))
+    assert merged == count_words_in_file(str(path))
+
+
+def test_count_parallel_matches_serial(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(wordCount, "MIN_SHARD_BYTES", 64)
+    path = tmp_path / "words.txt"
+    path.write_bytes((DATA_DIR / "TC3.txt").read_bytes())
+
+    counts = wordCount.count_parallel(str(path), 2)
+
+    assert counts == count_words_in_file(str(path))
+    assert sort_counts(counts) == sort_counts(count_words_in_file(str(path)))
+
+
 def test_sort_counts() -> None:
     counts = {"b": 2, "a": 2, "c": 3}
     results = sort_counts(counts)
@@ -27,4 +112,4 @@ def test_sort_counts() -> None:
     assert results[1].count == 2
 
     assert results[2].word == "b"
-    assert results[2].count == 2
\ No newline at end of file
+    assert results[2].count == 2
@@ -0,0 +1,110 @@
+"""
+Summation benchmark: naive loop vs compensated paths on P1 data.
+
+Usage (from 4.2/):
+    python benchmarks/bench_summation.py [data file] [--repeat N] [--scale N]
+
+--scale tiles the input N times so the timings are not dominated by call
+overhead (TC7 alone is only ~13k values). The error column is the
+absolute difference from the exact sum (computed with fractions).
+"""
+import sys
+import math
+import timeit
+from functools import partial
+from fractions import Fraction
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "P1" / "source"))
+
+# pylint: disable=wrong-import-position
+from file_utils import read_numbers_bulk
+from statistics_core import neumaier_add, np
+
+DEFAULT_DATA = ROOT / "P1" / "data" / "TC7.txt"
+UPDATE_BLOCK = 65536
+USAGE = "Usage: python benchmarks/bench_summation.py [file] [--repeat N] [--scale N]"
+
+
+def naive_loop(values: Sequence[float]) -> float:
+    """The loop statistics_core.mean used before compensated summation."""
+    total = 0.0
+    for value in values:
+        total += value
+    return total
+
+
+def neumaier_loop(values: Sequence[float]) -> float:
+    total, compensation = 0.0, 0.0
+    for value in values:
+        total, compensation = neumaier_add(total, compensation, value)
+    return total + compensation
+
+
+def blockwise_fsum(values: Sequence[float]) -> float:
+    """The StreamingStats sum: fsum per block, Neumaier across blocks."""
+    total, compensation = 0.0, 0.0
+    for start in range(0, len(values), UPDATE_BLOCK):
+        block_sum = math.fsum(values[start:start + UPDATE_BLOCK])
+        total, compensation = neumaier_add(total, compensation, block_sum)
+    return total + compensation
+
+
+def _methods() -> List[Tuple[str, Callable[[Sequence[float]], float]]]:
+    methods = [
+        ("naive loop", naive_loop),
+        ("builtin sum", sum),
+        ("neumaier loop", neumaier_loop),
+        ("math.fsum", math.fsum),
+        ("blockwise fsum", blockwise_fsum),
+    ]
+    if np is not None:
+        methods.append(("numpy pairwise", lambda values: float(np.sum(values))))
+    return methods
+
+
+def _parse_args(argv: List[str]) -> Tuple[Path, int, int]:
+    path, repeat, scale = DEFAULT_DATA, 5, 1
+    args = iter(argv)
+    for arg in args:
+        if arg in ("--repeat", "--scale"):
+            number = int(next(args, "0"))
+            if number <= 0:
+                raise ValueError(f"{arg} expects a positive integer")
+            if arg == "--repeat":
+                repeat = number
+            else:
+                scale = number
+        else:
+            path = Path(arg)
+    return path, repeat, scale
+
+
+def main() -> None:
+    try:
+        path, repeat, scale = _parse_args(sys.argv[1:])
+    except ValueError as error:
+        print(f"{error}\n{USAGE}")
+        sys.exit(1)
+
+    values = read_numbers_bulk(str(path)) * scale
+    array_values = values if np is None else np.frombuffer(values, np.float64)
+    exact = sum((Fraction(value) for value in values), Fraction(0))
+
+    print(f"{path.name} x{scale}: {len(values)} values, best of {repeat}")
+    print(f"{'method':<16}{'seconds':>12}{'Mvalues/s':>12}{'abs error':>14}")
+    for name, method in _methods():
+        data = array_values if name.startswith("numpy") else values
+        timer = timeit.Timer(partial(method, data))
+        seconds = min(timer.repeat(repeat=repeat, number=1))
+        error = abs(Fraction(method(data)) - exact)
+        print(
+            f"{name:<16}{seconds:>12.6f}{len(values) / seconds / 1e6:>12.2f}"
+            f"{float(error):>14.3e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Run a script and record its own peak RSS.
+
+Usage: python measure_child.py REPORT_FILE SCRIPT [ARGS...]
+
+The rusage of a child also counts the memory of the process that forked
+it, so run_benchmarks.py starts programs through this launcher instead:
+after exec, VmHWM in /proc/self/status only covers the script itself.
+The peak (in KiB) is written to REPORT_FILE even if the script exits
+with an error; the exit status is passed through.
+"""
+import sys
+import runpy
+import resource
+from pathlib import Path
+
+
+def peak_rss_kb() -> int:
+    try:
+        status = Path("/proc/self/status").read_text(encoding="utf-8")
+    except OSError:
+        # No procfs: fall back to rusage (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for line in status.splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main() -> None:
+    report_file, script = sys.argv[1], sys.argv[2]
+    sys.argv = sys.argv[2:]
+    sys.path.insert(0, str(Path(script).resolve().parent))
+    try:
+        runpy.run_path(script, run_name="__main__")
+    finally:
+        Path(report_file).write_text(str(peak_rss_kb()), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
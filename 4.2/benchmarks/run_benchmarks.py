@@ -0,0 +1,438 @@
+"""
+Benchmark suite for computeStatistics (P1), convertNumbers (P2) and
+wordCount (P3).
+
+Usage (from 4.2/):
+    python benchmarks/run_benchmarks.py [--sizes 3-5] [--programs p1,p2,p3]
+        [--repeat 3] [--output FILE] [--compare FILE] [--tolerance 0.5]
+
+For every program and every size 10^e in --sizes (default 10^4..10^6,
+up to 10^8) a synthetic input is generated once under benchmarks/.data/
+and then measured twice:
+- end to end: the real script in a subprocess (inside a scratch results
+  directory, so the evidence files are untouched); wall time is the best
+  of --repeat runs and peak RSS is measured by measure_child.py.
+- per phase: the phases of the program's own timer (P3 reads, tokenizes
+  and counts in one "count" pass; P1 splits its range reduce into read and
+  parse), timed in-process with the functions the script calls, with
+  lines/s and MB/s for each. Skipped above PHASE_MAX_LINES to keep the
+  benchmark's own memory sane.
+
+--output writes the measurements as JSON (a baseline); --compare checks
+them against a saved baseline and exits with status 1 if any wall or
+phase time regressed by more than --tolerance.
+"""
+import os
+import sys
+import json
+import logging
+import time
+import random
+import platform
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "shared"))
+for _project in ("P1", "P2", "P3"):
+    sys.path.insert(0, str(ROOT / _project / "source"))
+
+# pylint: disable=wrong-import-position
+from cli_options import ValuedFlags, parse_flag_args, positive_int
+from computeStatistics import (
+    CaseOutput,
+    RangeState,
+    RunOptions,
+    _CaseAccumulator,
+    _new_stats,
+)
+from convertNumbers import _format_bodies, _iter_lines, _open_input
+from converter_core import convert_numbers, parse_int_block
+from file_utils import parse_block, split_ranges
+from wordCount import _format_output
+from wordcount_core import count_words_in_file, sort_counts
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+# Below 10^6 lines most phases stay under _MIN_COMPARED_SECONDS
+DEFAULT_SIZES = [4, 5, 6]
+MAX_EXPONENT = 8
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.5
+PHASE_MAX_LINES = 10**7
+
+# Timings below this are mostly noise and never flagged as regressions
+_MIN_COMPARED_SECONDS = 0.05
+_SEED = 42
+_WORDS = (
+    "the of and to in is was he for it with as his on be at by had not are "
+    "but from or have an they which one you were her all she there would "
+    "their we him been has when who will more no if out so said what up its "
+    "about into than them can only other new some could time these two may "
+    "then do first any my now such like our over man me even most made after "
+    "also did many before must through back years where much your way well "
+    "niño año canción corazón über straße ÉCOLE ΣΟΦΙΑ"
+).split()
+
+USAGE = (
+    "Usage: python benchmarks/run_benchmarks.py [--sizes 3-5] "
+    "[--programs p1,p2,p3] [--repeat 3]\n"
+    "        [--output FILE] [--compare FILE] [--tolerance 0.5]"
+)
+
+
+def _number_line(rng: random.Random) -> str:
+    if rng.random() < 0.001:
+        return "abc"
+    # A limited pool of values so the mode is meaningful
+    return repr(round(rng.gauss(500.0, 150.0), 2))
+
+
+def _integer_line(rng: random.Random) -> str:
+    if rng.random() < 0.001:
+        return "12.5"
+    return str(rng.randint(-(2**40), 2**40))
+
+
+def _text_line(rng: random.Random) -> str:
+    # Zipf-like: earlier words in the list are much more frequent
+    count = rng.randint(4, 16)
+    picks = (_WORDS[int(len(_WORDS) * rng.random() ** 3)] for _ in range(count))
+    return " ".join(picks) + rng.choice((".", ",", "!", ""))
+
+
+_GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "p1": _number_line,
+    "p2": _integer_line,
+    "p3": _text_line,
+}
+
+
+def ensure_input(program: str, lines: int) -> Path:
+    """Generate (once) the synthetic input of a program with `lines` lines."""
+    path = DATA_DIR / f"{program}_{lines}.txt"
+    if path.exists():
+        return path
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(_SEED)
+    make_line = _GENERATORS[program]
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        remaining = lines
+        while remaining:
+            block = min(remaining, 100_000)
+            file.write("\n".join(make_line(rng) for _ in range(block)))
+            file.write("\n")
+            remaining -= block
+    os.replace(temp_path, path)
+    return path
+
+
+# --------------------------------------------
+# End to end
+# --------------------------------------------
+
+_SCRIPTS = {
+    "p1": (ROOT / "P1" / "source" / "computeStatistics.py", []),
+    "p2": (ROOT / "P2" / "source" / "convertNumbers.py", []),
+    "p3": (ROOT / "P3" / "source" / "wordCount.py", []),
+}
+_LAUNCHER = Path(__file__).resolve().parent / "measure_child.py"
+
+
+def run_program(program: str, input_path: Path) -> Tuple[float, int]:
+    """Run the real script once; returns (wall seconds, peak RSS in KiB)."""
+    script, extra_args = _SCRIPTS[program]
+    with tempfile.TemporaryDirectory() as scratch:
+        # Scripts write to ../results relative to their cwd
+        workdir = Path(scratch) / "source"
+        workdir.mkdir()
+        report = Path(scratch) / "peak_rss"
+        command = [
+            sys.executable,
+            str(_LAUNCHER),
+            str(report),
+            str(script),
+            *extra_args,
+            str(input_path),
+        ]
+        start = time.perf_counter()
+        completed = subprocess.run(
+            command,
+            cwd=workdir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        elapsed = time.perf_counter() - start
+        peak_rss = int(report.read_text(encoding="utf-8"))
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"{script.name} exited with {completed.returncode}")
+    return elapsed, peak_rss
+
+
+# --------------------------------------------
+# Per phase
+# --------------------------------------------
+
+def _statistics_phases(text: str) -> Dict[str, Callable[[object], object]]:
+    options = RunOptions(workers=1)
+
+    def read(path):
+        # The newline-aligned ranges of compute_statistics, as bytes
+        blocks = []
+        with open(path, "rb") as file:
+            for start, end, first_line in split_ranges(path, options.range_bytes):
+                file.seek(start)
+                blocks.append((file.read(end - start), first_line))
+        return blocks
+
+    def compute(arrays):
+        accumulator = _CaseAccumulator(options)
+        for values in arrays:
+            part = RangeState(_new_stats(options), values)
+            part.stats.update(values)
+            accumulator.add(part)
+        return accumulator.results()
+
+    return {
+        "read": read,
+        "parse": lambda blocks: [parse_block(*block) for block in blocks],
+        "compute": compute,
+        "format": lambda results: CaseOutput(text, results, 0.0).to_text(),
+    }
+
+
+def _converter_phases(text: str) -> Dict[str, Callable[[object], object]]:
+    def format_rows(conversions):
+        rows = [f"ITEM\t{text}\tBIN\tHEX"]
+        rows.extend(
+            f"{index}\t{body}"
+            for index, body in enumerate(_format_bodies(conversions), start=1)
+        )
+        return "\n".join(rows)
+
+    def read(path):
+        # The streaming line reader of convertNumbers, drained at once
+        with _open_input(path) as file:
+            return list(_iter_lines(file))
+
+    return {
+        "read": read,
+        "parse": lambda lines: parse_int_block(lines)[0],
+        "compute": convert_numbers,
+        "format": format_rows,
+    }
+
+
+def _wordcount_phases(text: str) -> Dict[str, Callable[[object], object]]:
+    def format_rows(sorted_results):
+        total_words = sum(item.count for item in sorted_results)
+        return _format_output(text, sorted_results, total_words, 0.0)
+
+    return {
+        "count": count_words_in_file,
+        "compute": sort_counts,
+        "format": format_rows,
+    }
+
+
+_PHASE_BUILDERS = {
+    "p1": _statistics_phases,
+    "p2": _converter_phases,
+    "p3": _wordcount_phases,
+}
+
+
+def _time_phases(program: str, input_path: Path) -> Dict[str, float]:
+    """Time each phase (in order) once, feeding each the previous output."""
+    steps = _PHASE_BUILDERS[program](input_path.stem)
+    seconds: Dict[str, float] = {}
+    value: object = str(input_path)
+    with tempfile.TemporaryDirectory() as scratch:
+        steps["write"] = lambda output: Path(scratch, "out.txt").write_text(
+            output, encoding="utf-8"
+        )
+        for phase, step in steps.items():
+            start = time.perf_counter()
+            value = step(value)
+            seconds[phase] = time.perf_counter() - start
+    return seconds
+
+
+def measure_phases(
+    program: str, input_path: Path, lines: int, repeat: int = 1
+) -> Dict[str, Dict[str, float]]:
+    """Best time of each phase over `repeat` runs, with its throughput."""
+    # The synthetic inputs contain invalid lines on purpose; their error
+    # logging is part of the end-to-end run, not of the phase report
+    logging.disable(logging.ERROR)
+    try:
+        runs = [_time_phases(program, input_path) for _ in range(repeat)]
+    finally:
+        logging.disable(logging.NOTSET)
+
+    size_mb = input_path.stat().st_size / 1e6
+    phases: Dict[str, Dict[str, float]] = {}
+    for phase in runs[0]:
+        seconds = min(run[phase] for run in runs)
+        phases[phase] = {
+            "seconds": seconds,
+            "lines_per_s": lines / seconds if seconds else 0.0,
+            "mb_per_s": size_mb / seconds if seconds else 0.0,
+        }
+    return phases
+
+
+# --------------------------------------------
+# Suite
+# --------------------------------------------
+
+def run_suite(
+    programs: List[str], exponents: List[int], repeat: int
+) -> Dict[str, object]:
+    results: Dict[str, Dict[str, object]] = {}
+    for program in programs:
+        per_size: Dict[str, object] = {}
+        for exponent in exponents:
+            lines = 10**exponent
+            input_path = ensure_input(program, lines)
+            runs = [run_program(program, input_path) for _ in range(repeat)]
+            wall = min(seconds for seconds, _ in runs)
+            entry: Dict[str, object] = {
+                "lines": lines,
+                "bytes": input_path.stat().st_size,
+                "wall_seconds": wall,
+                "lines_per_s": lines / wall,
+                "peak_rss_kb": max(rss for _, rss in runs),
+                "phases": None,
+            }
+            if lines <= PHASE_MAX_LINES:
+                entry["phases"] = measure_phases(program, input_path, lines, repeat)
+            per_size[str(lines)] = entry
+            print(
+                f"{program} 10^{exponent}: {wall:.3f}s wall, "
+                f"{entry['peak_rss_kb'] / 1024:.1f} MiB peak RSS"
+            )
+        results[program] = per_size
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def _timings(entry: Dict[str, object]) -> Dict[str, float]:
+    timings = {"wall": float(entry["wall_seconds"])}
+    for phase, numbers in (entry.get("phases") or {}).items():
+        timings[phase] = float(numbers["seconds"])
+    return timings
+
+
+def compare(
+    current: Dict[str, object], baseline: Dict[str, object], tolerance: float
+) -> List[str]:
+    """Human-readable regressions of `current` against `baseline`."""
+    regressions: List[str] = []
+    for program, per_size in current["results"].items():
+        base_sizes = baseline["results"].get(program, {})
+        for size, entry in per_size.items():
+            if size not in base_sizes:
+                continue
+            base = _timings(base_sizes[size])
+            for name, seconds in _timings(entry).items():
+                reference = base.get(name)
+                if reference is None or reference < _MIN_COMPARED_SECONDS:
+                    continue
+                if seconds > reference * (1.0 + tolerance):
+                    regressions.append(
+                        f"{program} {size} lines {name}: "
+                        f"{reference:.4f}s -> {seconds:.4f}s"
+                    )
+    return regressions
+
+
+def _parse_sizes(text: str) -> List[int]:
+    if "-" in text:
+        low, high = (int(part) for part in text.split("-", 1))
+        exponents = list(range(low, high + 1))
+    else:
+        exponents = [int(part) for part in text.split(",")]
+    if not exponents or min(exponents) < 1 or max(exponents) > MAX_EXPONENT:
+        raise ValueError(f"--sizes exponents must be within 1-{MAX_EXPONENT}")
+    return exponents
+
+
+def _parse_programs(text: str) -> List[str]:
+    programs = [part.strip().lower() for part in text.split(",")]
+    unknown = [program for program in programs if program not in _SCRIPTS]
+    if unknown:
+        raise ValueError(f"Unknown programs: {unknown}")
+    return programs
+
+
+@dataclass
+class BenchmarkOptions:
+    """Command line flags of the benchmark suite."""
+    sizes: List[int] = field(default_factory=lambda: list(DEFAULT_SIZES))
+    programs: List[str] = field(default_factory=lambda: list(_SCRIPTS))
+    repeat: int = DEFAULT_REPEAT
+    output: Optional[Path] = None
+    compare: Optional[Path] = None
+    tolerance: float = DEFAULT_TOLERANCE
+
+
+_VALUED_FLAGS: ValuedFlags = {
+    "--sizes": ("sizes", _parse_sizes),
+    "--programs": ("programs", _parse_programs),
+    "--repeat": ("repeat", positive_int),
+    "--output": ("output", Path),
+    "--compare": ("compare", Path),
+    "--tolerance": ("tolerance", float),
+}
+
+
+def _parse_args(argv: List[str]) -> BenchmarkOptions:
+    """Options of the suite; raises ValueError if argv is invalid."""
+    options = BenchmarkOptions()
+    extra = parse_flag_args(argv, options, _VALUED_FLAGS)
+    if extra:
+        raise ValueError(f"Unexpected arguments: {' '.join(extra)}")
+    return options
+
+
+def main() -> None:
+    try:
+        options = _parse_args(sys.argv[1:])
+    except ValueError as error:
+        print(f"{error}\n{USAGE}")
+        sys.exit(1)
+
+    report = run_suite(options.programs, options.sizes, options.repeat)
+
+    if options.output is not None:
+        options.output.parent.mkdir(parents=True, exist_ok=True)
+        options.output.write_text(
+            json.dumps(report, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"Saved baseline at {options.output}")
+
+    if options.compare is not None:
+        baseline = json.loads(options.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, options.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
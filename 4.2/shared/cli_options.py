@@ -0,0 +1,49 @@
+"""
+Flag-table command line parsing for the P1-P3 entry points.
+
+Each program keeps its options in a dataclass and declares two tables:
+switches (flags without a value -> attribute, value to set) and valued
+flags (flag -> attribute, converter). parse_flag_args fills the options
+from argv and returns the remaining arguments, the input files.
+"""
+from typing import Callable, List, Mapping, Optional, Tuple
+
+Switches = Mapping[str, Tuple[str, object]]
+ValuedFlags = Mapping[str, Tuple[str, Callable[[str], object]]]
+
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise ValueError(f"Expected a positive integer, got {text}")
+    return value
+
+
+def parse_flag_args(
+    argv: List[str],
+    options: object,
+    valued_flags: ValuedFlags,
+    switches: Optional[Switches] = None,
+) -> List[str]:
+    """
+    Set the flags of argv on `options` and return the other arguments;
+    raises ValueError for an unknown flag or a missing/invalid value.
+    """
+    switches = switches or {}
+    files: List[str] = []
+
+    args = iter(argv)
+    for arg in args:
+        if arg in switches:
+            setattr(options, *switches[arg])
+        elif arg in valued_flags:
+            name, convert = valued_flags[arg]
+            value = next(args, "")
+            if not value:
+                raise ValueError(f"{arg} needs a value")
+            setattr(options, name, convert(value))
+        elif arg.startswith("--"):
+            raise ValueError(f"Unknown option: {arg}")
+        else:
+            files.append(arg)
+    return files
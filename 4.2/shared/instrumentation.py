@@ -0,0 +1,180 @@
+"""
+Phase timing and optional profiling for the P1-P3 entry points.
+
+Each program wraps its phases (read, parse, compute, format, write) in
+PhaseTimer.span() and appends report_text() to its results file, in the
+same locked_append() as the test case, so the time split of every test
+case is kept with the evidence. Profiling is off by default;
+`--profile[=cprofile|tracemalloc|all]` on the command line or the
+PROFILE_ENV variable turns it on without editing the code.
+"""
+import os
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: the results append is simply not locked
+    fcntl = None
+
+PROFILE_ENV = "INSTRUMENT_PROFILE"
+PROFILE_MODES = ("cprofile", "tracemalloc", "all")
+PROFILE_FLAG = "--profile"
+DEFAULT_PROFILE_TOP = 10
+
+
+class PhaseTimer:
+    """Wall time (perf_counter) per named phase, in first-seen order."""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        # Peak traced memory per phase, only while tracemalloc is running
+        self.peaks: Dict[str, int] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (
+                time.perf_counter() - start
+            )
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peaks[name] = max(self.peaks.get(name, 0), peak)
+
+    def add(self, other: "PhaseTimer") -> None:
+        """Fold in the phases timed elsewhere (e.g. in a worker process)."""
+        for name, seconds in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for name, peak in other.peaks.items():
+            self.peaks[name] = max(self.peaks.get(name, 0), peak)
+
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def report_lines(self, separator: str = ": ") -> List[str]:
+        total = self.total()
+        lines: List[str] = []
+        for name, seconds in self.phases.items():
+            share = 100.0 * seconds / total if total else 0.0
+            lines.append(f"PhaseSeconds[{name}]{separator}{seconds:.6f} ({share:.1f}%)")
+        for name, peak in self.peaks.items():
+            lines.append(f"PhasePeakBytes[{name}]{separator}{peak}")
+        return lines
+
+
+class Profiler:
+    """cProfile and/or tracemalloc capture around a whole run."""
+
+    def __init__(self, mode: Optional[str] = None) -> None:
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of {PROFILE_MODES}")
+        self.mode = mode
+        self._profile: Optional[cProfile.Profile] = None
+        self._peak_bytes: Optional[int] = None
+
+    @property
+    def uses_cprofile(self) -> bool:
+        return self.mode in ("cprofile", "all")
+
+    @property
+    def uses_tracemalloc(self) -> bool:
+        return self.mode in ("tracemalloc", "all")
+
+    def start(self) -> None:
+        if self.uses_tracemalloc:
+            tracemalloc.start()
+        if self.uses_cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        if self.uses_tracemalloc and tracemalloc.is_tracing():
+            self._peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def report_lines(
+        self, separator: str = ": ", top: int = DEFAULT_PROFILE_TOP
+    ) -> List[str]:
+        lines: List[str] = []
+        if self._peak_bytes is not None:
+            lines.append(f"TracedPeakBytes{separator}{self._peak_bytes}")
+        if self._profile is None:
+            return lines
+
+        stats = pstats.Stats(self._profile)
+        ranked = sorted(
+            stats.stats.items(),  # pylint: disable=no-member
+            key=lambda item: item[1][3],
+            reverse=True,
+        )
+        for rank, (func, (_, calls, own, cumulative, _)) in enumerate(
+            ranked[:top], start=1
+        ):
+            file_name, line, name = func
+            where = f"{os.path.basename(file_name)}:{line}({name})"
+            lines.append(
+                f"ProfileTop[{rank}]{separator}{cumulative:.6f}s cumulative, "
+                f"{own:.6f}s own, {calls} calls - {where}"
+            )
+        return lines
+
+
+def report_text(timer: PhaseTimer, profiler: Profiler, separator: str = ":\t") -> str:
+    """Phase breakdown (and profile summary, if enabled) of a run."""
+    return "\n".join(
+        timer.report_lines(separator) + profiler.report_lines(separator)
+    )
+
+
+@contextmanager
+def locked_append(path: Path, buffering: int = -1) -> Iterator[TextIO]:
+    """
+    Open a results file for appending, under an exclusive flock held until
+    the block ends, so concurrent runs never interleave what they append.
+    """
+    path.parent.mkdir(exist_ok=True)
+    with open(path, "a", encoding="utf-8", buffering=buffering) as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield file
+        finally:
+            try:
+                # Nothing may reach the file after the lock is released
+                file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def split_profile_args(argv: List[str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Remove --profile / --profile=MODE from argv and return the profile
+    mode (falling back to the PROFILE_ENV variable) and the other args.
+    """
+    mode = os.environ.get(PROFILE_ENV) or None
+    remaining: List[str] = []
+    for arg in argv:
+        if arg == PROFILE_FLAG:
+            mode = "cprofile"
+        elif arg.startswith(PROFILE_FLAG + "="):
+            mode = arg.split("=", 1)[1]
+        else:
+            remaining.append(arg)
+
+    if mode is not None and mode not in PROFILE_MODES:
+        raise ValueError(f"Profile mode must be one of {PROFILE_MODES}")
+    return mode, remaining